@@ -0,0 +1,55 @@
+"""
+Save and load time and file size of a large locked config with every registered backend.
+
+    python benchmarks/bench_backends.py --groups 100
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import timeit
+
+from nxcl.core.config import ConfigDict, get_backend, load_config, save_config
+
+FORMATS = [("yaml", ".yaml"), ("json", ".json"), ("pickle", ".pkl"), ("msgpack", ".msgpack")]
+
+
+def make_config(groups: int) -> ConfigDict:
+    config = ConfigDict({
+        f"group{i}": {
+            f"sub{j}": {f"key{k}": k * 0.5 if k % 3 else f"value{k}" for k in range(100)}
+            for j in range(10)
+        }
+        for i in range(groups)
+    })
+    config["group0.sub0.func"] = math.sqrt
+    return config.lock()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config = make_config(args.groups)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, extension in FORMATS:
+            try:
+                get_backend(name)
+            except ValueError:
+                print(f"{name:8s} not available")
+                continue
+
+            path = os.path.join(tmp_dir, "config" + extension)
+            save = min(timeit.repeat(
+                lambda: save_config(config, path), number=1, repeat=args.repeat,
+            ))
+            load = min(timeit.repeat(lambda: load_config(path), number=1, repeat=args.repeat))
+            print(f"{name:8s} save {save * 1e3:8.1f} ms  load {load * 1e3:8.1f} ms  "
+                  f"{os.path.getsize(path) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
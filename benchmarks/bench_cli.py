@@ -0,0 +1,48 @@
+"""
+Startup time of applying two command line overrides to a large config, with a parser that has an
+option for every leaf (``add_config_arguments``) and with ``parse_config_arguments``.
+
+    python benchmarks/bench_cli.py --groups 100
+"""
+
+import argparse
+import time
+
+from nxcl.config import ConfigDict, add_config_arguments, parse_config_arguments
+
+OVERRIDES = ["--group3.sub4.key5=1.5", "--group9.sub9.key49", "7"]
+
+
+def make_config(groups: int) -> ConfigDict:
+    return ConfigDict({
+        f"group{i}": {f"sub{j}": {f"key{k}": k * 0.5 for k in range(50)} for j in range(10)}
+        for i in range(groups)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=100)
+    args = parser.parse_args()
+
+    config = make_config(args.groups)
+    start = time.perf_counter()
+    config_parser = argparse.ArgumentParser()
+    add_config_arguments(config_parser, config)
+    for key, value in vars(config_parser.parse_args(OVERRIDES)).items():
+        config[key] = value
+    full = time.perf_counter() - start
+
+    lazy_config = make_config(args.groups)
+    start = time.perf_counter()
+    parse_config_arguments(lazy_config, OVERRIDES)
+    lazy = time.perf_counter() - start
+
+    assert lazy_config == config
+    print(f"{args.groups * 500} leaves, 2 overrides")
+    print(f"add_config_arguments + parse_args {full * 1e3:8.1f} ms")
+    print(f"parse_config_arguments            {lazy * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Time and memory of copying a ConfigDict and overriding a few leaves, with a recursive copy and a
+copy-on-write copy, which is also locked afterwards.
+
+    python benchmarks/bench_copy.py --copies 100
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from nxcl.core.config import ConfigDict
+
+
+def make_config() -> ConfigDict:
+    return ConfigDict({
+        f"group{i}": {f"sub{j}": {f"key{k}": k for k in range(10)} for j in range(10)}
+        for i in range(100)
+    })
+
+
+def copy_and_override(config: ConfigDict, lock: bool = False, **kwargs) -> ConfigDict:
+    copy = config.copy(**kwargs)
+    copy["group3.sub4.key5"] = -1
+    copy["group50.sub1.key0"] = -2
+    copy["group99.sub9.key9"] = -3
+    return copy.lock() if lock else copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=100)
+    args = parser.parse_args()
+
+    config = make_config()
+    for name, kwargs in [
+        ("recursive", {"recursive": True}),
+        ("copy-on-write", {"copy_on_write": True}),
+        ("locked", {"copy_on_write": True, "lock": True}),
+    ]:
+        elapsed = min(timeit.repeat(
+            lambda: copy_and_override(config, **kwargs), number=args.copies, repeat=3,
+        )) / args.copies
+
+        tracemalloc.start()
+        copies = [copy_and_override(config, **kwargs) for _ in range(args.copies)]
+        memory = tracemalloc.get_traced_memory()[0] / len(copies)
+        tracemalloc.stop()
+
+        print(f"{name:14s} {elapsed * 1e3:8.3f} ms  {memory / 1024:8.1f} KiB per copy")
+
+
+if __name__ == "__main__":
+    main()
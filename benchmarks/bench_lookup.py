@@ -0,0 +1,99 @@
+"""
+Time dotted key lookups on a ConfigDict, with and without the lookup index, against the lookup path
+of ConfigDict before compiled keys, which validates and splits the key on every call and walks it
+through __get_penultimate and __get_child. Also report the memory of the config.
+
+    python benchmarks/bench_lookup.py --number 100000
+"""
+
+import argparse
+import timeit
+import tracemalloc
+
+from nxcl.core.config import ConfigDict
+from nxcl.core.config.base import SEPERATOR, is_valid_key, tokenize_key
+
+
+def make_config() -> ConfigDict:
+    return ConfigDict({
+        f"group{i}": {f"sub{j}": {f"key{k}": k for k in range(10)} for j in range(10)}
+        for i in range(100)
+    })
+
+
+# The previous lookup path, with the same checks and calls.
+
+def baseline_get_penultimate(config: ConfigDict, key: str, none_if_not_exist: bool = False):
+    if not is_valid_key(key):
+        raise KeyError(f"Invalid key '{key}'")
+
+    sub_keys = tokenize_key(key)
+    cursor = config
+
+    for idx, sub_key in enumerate(sub_keys[:-1]):
+        if not isinstance(cursor, ConfigDict):
+            cur_key = SEPERATOR.join(sub_key[:idx])
+            raise KeyError(f"Invalid key '{key}': '{cur_key}' is not a ConfigDict.")
+        elif not dict.__contains__(cursor, sub_key):
+            if none_if_not_exist:
+                return None
+            cur_key = SEPERATOR.join(sub_key[:idx])
+            raise KeyError(f"Invalid key '{key}': '{cur_key}' not found.")
+        else:
+            cursor = dict.__getitem__(cursor, sub_key)
+
+    return cursor, sub_keys[-1]
+
+
+def baseline_get_child(config: ConfigDict, atomic_key: str):
+    if dict.__contains__(config, atomic_key):
+        return dict.__getitem__(config, atomic_key)
+    else:
+        raise KeyError(f"'{atomic_key}' not found.")
+
+
+def baseline_getitem(config: ConfigDict, key: str):
+    pen_node, pen_key = baseline_get_penultimate(config, key)
+    return baseline_get_child(pen_node, pen_key)
+
+
+def baseline_contains(config: ConfigDict, key: str) -> bool:
+    pen = baseline_get_penultimate(config, key, none_if_not_exist=True)
+    return pen is not None and dict.__contains__(pen[0], pen[1])
+
+
+def baseline_get(config: ConfigDict, key: str, default=None):
+    return baseline_getitem(config, key) if baseline_contains(config, key) else default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    config = make_config()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memory of {len(config.keys(flatten=True))} leaves: {size / 1e6:.2f} MB")
+
+    key = "group42.sub7.key3"
+    cases = [
+        ("baseline [key]", lambda: baseline_getitem(config, key)),
+        ("baseline get", lambda: baseline_get(config, key)),
+        ("baseline in", lambda: baseline_contains(config, key)),
+        ("config[key]", lambda: config[key]),
+        ("config.get(key)", lambda: config.get(key)),
+        ("key in config", lambda: key in config),
+        ("config.attr", lambda: config.group42),
+    ]
+    for indexed in (False, True):
+        config.use_index(indexed)
+        print(f"use_index({indexed})")
+        for name, func in cases:
+            elapsed = min(timeit.repeat(func, number=args.number, repeat=3)) / args.number
+            print(f"  {name:16s} {elapsed * 1e9:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Round-trip time and payload size of pickling a ConfigDict, against pickling its nested dicts and
+rebuilding it, and round trips through a ``multiprocessing.Pool``.
+
+    python benchmarks/bench_pickle.py --workers 4
+"""
+
+import argparse
+import multiprocessing
+import pickle
+import time
+import timeit
+
+from nxcl.core.config import ConfigDict
+
+
+def make_config() -> ConfigDict:
+    return ConfigDict({
+        f"group{i}": {f"sub{j}": {f"key{k}": k * 0.5 for k in range(50)} for j in range(10)}
+        for i in range(100)
+    })
+
+
+def echo(value):
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=16)
+    args = parser.parse_args()
+
+    config = make_config()
+    for name, dump, load in [
+        ("nested dicts", lambda: config.to_dict(), ConfigDict),
+        ("ConfigDict", lambda: config, lambda value: value),
+    ]:
+        data = pickle.dumps(dump(), protocol=pickle.HIGHEST_PROTOCOL)
+        dumps = min(timeit.repeat(
+            lambda: pickle.dumps(dump(), protocol=pickle.HIGHEST_PROTOCOL), number=1, repeat=5,
+        ))
+        loads = min(timeit.repeat(lambda: load(pickle.loads(data)), number=1, repeat=5))
+        print(f"{name:12s} dumps {dumps * 1e3:7.1f} ms  loads {loads * 1e3:7.1f} ms  "
+              f"{len(data) / 1e6:.2f} MB")
+
+    with multiprocessing.Pool(args.workers) as pool:
+        pool.map(echo, range(args.workers))
+        start = time.perf_counter()
+        pool.map(echo, [config] * args.tasks, chunksize=1)
+        elapsed = time.perf_counter() - start
+    print(f"Pool: {args.tasks} round trips in {elapsed * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare the pure-Python and the libyaml-backed NXCL loaders and dumpers on a generated config.
+
+    python benchmarks/bench_yaml.py --groups 50 --items 200
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+from nxcl.core.config import (
+    LIBYAML_AVAILABLE,
+    ConfigDict,
+    NXCLCDumper,
+    NXCLCLoader,
+    NXCLDumper,
+    NXCLLoader,
+    load_config,
+    save_config,
+)
+
+
+def make_config(groups: int, items: int) -> ConfigDict:
+    return ConfigDict({
+        f"group{i}": {
+            f"item{j}": {"a": j, "b": f"text {j} " * 5, "c": [j, 1.5, None, True], "d": {"e": "x"}}
+            for j in range(items)
+        }
+        for i in range(groups)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not LIBYAML_AVAILABLE:
+        raise SystemExit("libyaml is not available")
+
+    config = make_config(args.groups, args.items)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "config.yaml")
+        save_config(config, path)
+        print(f"{os.path.getsize(path) / 1e6:.2f} MB of YAML")
+
+        for name, Loader, Dumper in [
+            ("pure", NXCLLoader, NXCLDumper),
+            ("libyaml", NXCLCLoader, NXCLCDumper),
+        ]:
+            load = min(timeit.repeat(
+                lambda: load_config(path, Loader=Loader), number=1, repeat=args.repeat,
+            ))
+            save = min(timeit.repeat(
+                lambda: save_config(config, path, Dumper=Dumper), number=1, repeat=args.repeat,
+            ))
+            print(f"{name:8s} load {load * 1e3:8.1f} ms  save {save * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
 from nxcl.core.config import *
 
 from .argparse import *
+from .sweep import *
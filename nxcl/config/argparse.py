@@ -1,15 +1,41 @@
-from typing import Optional
-from argparse import SUPPRESS, ArgumentParser, ArgumentTypeError  #, Action
+import os
+import re
+import sys
+import pickle
+import hashlib
+import tempfile
+from os import PathLike
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from argparse import SUPPRESS, ArgumentParser, ArgumentTypeError, Namespace  #, Action
 
 from nxcl.core.config import ConfigDict
+from nxcl.core.config.base import _has_mutable_leaves
 
 
 __all__ = [
     # "ConfigAction",
     "add_config_arguments",
+    "parse_config_arguments",
+    "apply_config_arguments",
+    "clear_parser_cache",
 ]
 
 
+_MISSING = object()
+
+# Same as argparse, which takes negative numbers as values instead of options.
+_NEGATIVE_NUMBER = re.compile(r"^-\d+$|^-\d*\.\d+$")
+
+_HELP_FLAGS = ("-h", "--help")
+
+_COERCERS: Dict[type, Callable[[Any], Any]] = {}
+
+PARSER_CACHE_SIZE = 64
+_PARSER_SPECS = OrderedDict()
+
+
 def convert_to_bool(v):
     if isinstance(v, bool):
         return v
@@ -24,6 +50,78 @@ def convert_to_bool(v):
         raise ArgumentTypeError("Boolean value expected.")
 
 
+def _get_argument_type(value: Any) -> Tuple[Callable[[str], Any], Optional[str]]:
+    # Type and nargs of the argument of a leaf, which are inferred from its current value.
+    if isinstance(value, (list, tuple)):
+        return (type(value[0]) if value else str), "*"
+    elif isinstance(value, bool):
+        return convert_to_bool, None
+    elif value is None:
+        return str, None
+    else:
+        return type(value), None
+
+
+def _compile_coercer(leaf_type: type) -> Callable[[Any], Any]:
+    # Parsed values already have the type of the leaf, except for sequences, which are parsed as
+    # lists, and values given as strings (e.g. by ``parse_known_args`` callers or environments).
+    if leaf_type is bool:
+        return convert_to_bool
+    elif leaf_type is tuple or leaf_type is list:
+        def coerce_sequence(v):
+            if v.__class__ is not leaf_type and isinstance(v, (list, tuple)):
+                return leaf_type(v)
+            return v
+        return coerce_sequence
+    elif leaf_type is int or leaf_type is float:
+        return lambda v: leaf_type(v) if v.__class__ is str else v
+    else:
+        return None
+
+
+def _get_coercer(leaf: Any) -> Optional[Callable[[Any], Any]]:
+    # Coercers are compiled once for each type of leaf, and are None if values are set as is. They
+    # only depend on the type, so the table is shared by all configs instead of being compiled for
+    # each config, which would flatten the whole config for a few overrides and be dropped as soon
+    # as the overrides are applied.
+    leaf_type = leaf.__class__
+    try:
+        return _COERCERS[leaf_type]
+    except KeyError:
+        coercer = _COERCERS[leaf_type] = _compile_coercer(leaf_type)
+        return coercer
+
+
+def _apply_overrides(config: ConfigDict, overrides: Iterable[Tuple[str, Any]]) -> List[str]:
+    # Overrides are grouped by their parent, so each parent is looked up once. Keys which are not
+    # leaves of the config are skipped, and the applied keys are returned.
+    groups: Dict[str, List[Tuple[str, str, Any]]] = {}
+    for key, value in overrides:
+        parent, _, name = key.rpartition(".")
+        groups.setdefault(parent, []).append((key, name, value))
+
+    applied = []
+    for parent, items in groups.items():
+        if parent:
+            node = config.get(parent) if parent in config else None
+            if not isinstance(node, ConfigDict):
+                continue
+        else:
+            node = config
+
+        for key, name, value in items:
+            leaf = dict.get(node, name, _MISSING)
+            if leaf is _MISSING or isinstance(leaf, ConfigDict):
+                continue
+            coercer = _get_coercer(leaf)
+            if coercer is not None:
+                value = coercer(value)
+            setattr(node, name, value)
+            applied.append(key)
+
+    return applied
+
+
 # class ConfigAction(Action):
 #     def __init__(
 #         self,
@@ -44,15 +142,131 @@ def convert_to_bool(v):
 #         setattr(namespace, self.dest, values)
 
 
+def _get_spec_dir(cache_dir: Optional[PathLike]) -> Path:
+    if cache_dir is None:
+        cache_dir = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")) / "nxcl" / "parsers"
+    return Path(cache_dir).expanduser()
+
+
+def _compute_structure(config: ConfigDict) -> Tuple[bytes, List[str]]:
+    # Digest of the keys and the types of the leaves, which determine the arguments, and the help
+    # of every argument, which depends on the values.
+    digest, helps = hashlib.sha256(), []
+    for key, value in config.items(flatten=True):
+        if key.startswith("_"):
+            continue
+        types = [value.__class__]
+        if isinstance(value, (list, tuple)) and value:
+            types.append(value[0].__class__)
+        digest.update(key.encode("utf-8") + b"\0")
+        type_names = ",".join(f"{t.__module__}.{t.__qualname__}" for t in types)
+        digest.update(type_names.encode("utf-8") + b"\n")
+        helps.append(f"Default: {value}")
+    return digest.digest(), helps
+
+
+def _load_parser_spec(key: str, use_disk: bool, cache_dir: Optional[PathLike]) -> Optional[list]:
+    spec = _PARSER_SPECS.get(key)
+    if spec is not None:
+        _PARSER_SPECS.move_to_end(key)
+        return spec
+
+    if use_disk:
+        try:
+            with (_get_spec_dir(cache_dir) / f"{key}.pkl").open("rb") as f:
+                cached_key, spec = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError,
+                TypeError):
+            return None
+        if cached_key == key:
+            _store_parser_spec(key, spec, False, None)
+            return spec
+
+    return None
+
+
+def _store_parser_spec(key: str, spec: list, use_disk: bool, cache_dir: Optional[PathLike]):
+    _PARSER_SPECS[key] = spec
+    _PARSER_SPECS.move_to_end(key)
+    while len(_PARSER_SPECS) > PARSER_CACHE_SIZE:
+        _PARSER_SPECS.popitem(last=False)
+
+    if use_disk:
+        cache_dir = _get_spec_dir(cache_dir)
+        try:
+            data = pickle.dumps((key, spec), protocol=pickle.HIGHEST_PROTOCOL)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, cache_dir / f"{key}.pkl")
+        except (OSError, pickle.PicklingError, AttributeError, TypeError):
+            pass
+
+
+def clear_parser_cache(cache_dir: Optional[PathLike] = None, disk: bool = True):
+    """
+    Clear the in-process parser specs, and the ones on disk if ``disk``.
+    """
+
+    _PARSER_SPECS.clear()
+    if disk:
+        cache_dir = _get_spec_dir(cache_dir)
+        if cache_dir.exists():
+            for cache_path in cache_dir.glob("*.pkl"):
+                try:
+                    cache_path.unlink()
+                except OSError:
+                    pass
+
+
+def _add_spec_arguments(parser: ArgumentParser, spec: list, helps: List[str]):
+    for (flags, dest, t, nargs, metavar), help in zip(spec, helps):
+        parser.add_argument(
+            *flags, type=t, nargs=nargs, default=SUPPRESS, metavar=metavar, dest=dest, help=help,
+        )
+
+
 def add_config_arguments(
     parser: ArgumentParser,
     config: ConfigDict,
     prefix: Optional[str] = None,
     aliases: Optional[dict] = None,
+    cache: Union[bool, str] = False,
+    cache_dir: Optional[PathLike] = None,
 ):
+    """
+    Add a ``--key`` argument for every leaf of ``config``, with the type of its value.
+
+    If ``cache`` is ``True``, the arguments are cached in-process (LRU) and on disk under
+    ``cache_dir`` (default: ``$XDG_CACHE_HOME/nxcl/parsers``) as pickles, and with ``"memory"``
+    only in-process. Entries are keyed by the structure of the config (keys and leaf types), the
+    prefix and the aliases, so configs with other values share them. Only enable the disk cache in
+    a cache directory that nobody else can write to.
+    """
+
+    if cache not in (False, True, "memory"):
+        raise ValueError(f"Invalid cache mode '{cache}'")
+
     if aliases is None:
         aliases = {}
 
+    if cache:
+        # The structure is cached on the config as well, until it is modified. Leaves such as lists
+        # can be changed in place, so it is computed again for configs with mutable leaves.
+        if _has_mutable_leaves(config):
+            structure, helps = _compute_structure(config)
+        else:
+            structure, helps = config._get_cached("argparse", _compute_structure)
+        options = repr((prefix, sorted(aliases.items()))).encode()
+        spec_key = hashlib.sha256(structure + options).hexdigest()
+        spec = _load_parser_spec(spec_key, cache is True, cache_dir)
+        if spec is not None:
+            _add_spec_arguments(parser, spec, helps)
+            return
+
+    spec = []
+
     for key, value in config.items(flatten=True):
         if key.startswith("_"):
             continue
@@ -71,25 +285,144 @@ def add_config_arguments(
         else:
             flags = [key_flag]
 
-        if isinstance(value, (list, tuple)):
-            t = type(value[0]) if value else str
-            nargs = "*"
-        elif isinstance(value, bool):
-            t = convert_to_bool
-            nargs = None
-        elif value is None:
-            t = str
-            nargs = None
-        else:
-            t = type(value)
-            nargs = None
+        t, nargs = _get_argument_type(value)
+        metavar = key.split(".")[-1].upper()
 
         parser.add_argument(
             *flags,
             type=t,
             nargs=nargs,
             default=SUPPRESS,
-            metavar=key.split(".")[-1].upper(),
+            metavar=metavar,
             dest=key,
             help=f"Default: {value}",
         )
+        spec.append((tuple(flags), key, t, nargs, metavar))
+
+    if cache:
+        _store_parser_spec(spec_key, spec, cache is True, cache_dir)
+
+
+def _is_value(arg: str) -> bool:
+    return not arg.startswith("-") or bool(_NEGATIVE_NUMBER.match(arg))
+
+
+def _convert(t: Callable[[str], Any], value: str, flag: str) -> Any:
+    # Errors are worded as in argparse.
+    try:
+        return t(value)
+    except ArgumentTypeError as e:
+        raise ArgumentTypeError(f"argument {flag}: {e}") from None
+    except (TypeError, ValueError):
+        name = getattr(t, "__name__", repr(t))
+        raise ArgumentTypeError(f"argument {flag}: invalid {name} value: {value!r}") from None
+
+
+def parse_config_arguments(
+    config: ConfigDict,
+    args: Optional[Sequence[str]] = None,
+    prefix: Optional[str] = None,
+    aliases: Optional[dict] = None,
+    parser: Optional[ArgumentParser] = None,
+) -> List[str]:
+    """
+    Apply ``--a.b.c=value`` (or ``--a.b.c value``) overrides in ``args`` to ``config`` directly,
+    with the same flags, types and aliases as ``add_config_arguments``, and return the other args.
+
+    Only the overridden keys are looked up, so no parser is built for the config unless help is
+    requested. Then, the config arguments are added to ``parser`` (or a new parser), which prints
+    the help and exits. Invalid values are reported with ``parser.error`` as well.
+
+    Example:
+        >>> parser = ArgumentParser()
+        >>> parser.add_argument("--seed", type=int)
+        >>> args = parser.parse_args(parse_config_arguments(config, parser=parser))
+    """
+
+    args = list(sys.argv[1:] if args is None else args)
+    if parser is None:
+        parser = ArgumentParser()
+
+    if any(arg in _HELP_FLAGS for arg in args[:args.index("--") if "--" in args else len(args)]):
+        add_config_arguments(parser, config, prefix=prefix, aliases=aliases)
+        parser.parse_args(args)
+
+    alias_keys = {}
+    for key, alias in (aliases or {}).items():
+        for flag in ([alias] if isinstance(alias, str) else alias):
+            alias_keys[flag] = key
+
+    key_prefix = f"{prefix}." if prefix else ""
+    remaining, updates, i = [], [], 0
+
+    while i < len(args):
+        arg = args[i]
+        i += 1
+
+        if arg == "--":
+            remaining.extend(args[i - 1:])
+            break
+
+        flag, has_value, value = arg.partition("=")
+        key = alias_keys.get(flag)
+        if key is None:
+            if not flag.startswith("--" + key_prefix):
+                remaining.append(arg)
+                continue
+            key = flag[2:]
+
+        leaf = _MISSING
+        if key.startswith(key_prefix) and not key[len(key_prefix):].startswith("_"):
+            try:
+                leaf = config.get(key[len(key_prefix):], _MISSING)
+            except KeyError:
+                pass
+        if leaf is _MISSING or isinstance(leaf, ConfigDict):
+            remaining.append(arg)
+            continue
+
+        t, nargs = _get_argument_type(leaf)
+        if has_value:
+            values = [value]
+        elif nargs == "*":
+            values = []
+            while i < len(args) and _is_value(args[i]):
+                values.append(args[i])
+                i += 1
+        elif i < len(args) and _is_value(args[i]):
+            values = [args[i]]
+            i += 1
+        else:
+            parser.error(f"argument {flag}: expected one argument")
+
+        try:
+            if nargs == "*":
+                updates.append((key[len(key_prefix):], [_convert(t, v, flag) for v in values]))
+            else:
+                updates.append((key[len(key_prefix):], _convert(t, values[0], flag)))
+        except ArgumentTypeError as e:
+            parser.error(str(e))
+
+    _apply_overrides(config, updates)
+    return remaining
+
+
+def apply_config_arguments(
+    config: ConfigDict,
+    namespace: Union[Namespace, Mapping[str, Any]],
+    prefix: Optional[str] = None,
+) -> List[str]:
+    """
+    Apply the config arguments of a namespace parsed with ``add_config_arguments`` to ``config``
+    in one batch, and return the applied keys. Other attributes of the namespace are ignored.
+
+    Values are coerced to the type of the current leaf, e.g. lists to tuples, or strings to numbers.
+    """
+
+    items = vars(namespace).items() if isinstance(namespace, Namespace) else namespace.items()
+    key_prefix = f"{prefix}." if prefix else ""
+    overrides = [
+        (k[len(key_prefix):], v) for k, v in items
+        if k.startswith(key_prefix) and not k[len(key_prefix):].startswith("_")
+    ]
+    return _apply_overrides(config, overrides)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from nxcl.core.config import ConfigDict
+
+
+__all__ = [
+    "Sweep",
+]
+
+
+class Sweep(Sequence):
+    """
+    Lazy product of sweep axes over a base config.
+
+    Axes map dotted keys to sequences of values. A tuple of dotted keys maps to a sequence of value
+    tuples, which are swept together (zipped). The last axis varies fastest, like
+    ``itertools.product``. Variants are built on access as copy-on-write copies of the base config,
+    so they share every subtree without overrides, and the product is never materialized.
+
+    Example:
+        >>> sweep = Sweep(config, {
+        ...     "train.lr": [0.1, 0.01],
+        ...     ("model.width", "model.depth"): [(64, 2), (128, 4)],
+        ... })
+        >>> len(sweep)
+        4
+        >>> for variant in sweep.shard(rank, world_size): ...
+        >>> for variant in sweep.sample(10, seed=0): ...
+    """
+
+    def __init__(
+        self,
+        config: ConfigDict,
+        axes: Mapping[Union[str, Tuple[str, ...]], Sequence[Any]],
+    ):
+        self.config = config
+        self.axes: List[Tuple[Tuple[str, ...], Sequence[Any]]] = []
+
+        for keys, values in axes.items():
+            if isinstance(keys, str):
+                keys, values = (keys,), [(value,) for value in values]
+            elif not isinstance(keys, tuple):
+                raise TypeError(f"Invalid sweep axis '{keys}'")
+            elif any(len(value) != len(keys) for value in values):
+                raise ValueError(
+                    f"Values of sweep axis {keys} should be tuples of length {len(keys)}"
+                )
+            self.axes.append((keys, values))
+
+        size = 1
+        for _, values in self.axes:
+            size *= len(values)
+        self.size = size
+
+        # Index of each variant in the full product, or None for the full product itself.
+        self.indices: Optional[Sequence[int]] = None
+
+    def __len__(self) -> int:
+        return self.size if self.indices is None else len(self.indices)
+
+    def __repr__(self):
+        axes = ", ".join(
+            f"{keys if len(keys) > 1 else keys[0]}: {len(values)}" for keys, values in self.axes
+        )
+        return f"Sweep({{{axes}}}, size={len(self)})"
+
+    def __subset(self, indices: Sequence[int]) -> Sweep:
+        subset = Sweep.__new__(Sweep)
+        subset.config, subset.axes, subset.size = self.config, self.axes, self.size
+        subset.indices = indices
+        return subset
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ConfigDict, Sweep]:
+        indices = range(self.size) if self.indices is None else self.indices
+        if isinstance(index, slice):
+            return self.__subset(indices[index])
+        if not -len(indices) <= index < len(indices):
+            raise IndexError(f"Sweep index {index} out of range for {len(indices)} variants")
+        return self.variant(indices[index])
+
+    def __iter__(self) -> Iterator[ConfigDict]:
+        indices = range(self.size) if self.indices is None else self.indices
+        for index in indices:
+            yield self.variant(index)
+
+    def overrides(self, index: int) -> dict:
+        """
+        Return the swept values of the ``index``-th variant of the full product by dotted key.
+        """
+
+        if not 0 <= index < self.size:
+            raise IndexError(f"Sweep index {index} out of range")
+
+        choices = []
+        for keys, values in reversed(self.axes):
+            index, value_index = divmod(index, len(values))
+            choices.append((keys, values[value_index]))
+
+        overrides = {}
+        for keys, value in reversed(choices):
+            overrides.update(zip(keys, value))
+        return overrides
+
+    def variant(self, index: int) -> ConfigDict:
+        """
+        Build the ``index``-th variant of the full product.
+        """
+
+        variant = self.config.copy(copy_on_write=True)
+        for key, value in self.overrides(index).items():
+            variant[key] = value
+        return variant
+
+    def shard(self, index: int, num_shards: int) -> Sweep:
+        """
+        Return the ``index``-th of ``num_shards`` interleaved slices of this sweep.
+        """
+
+        if not 0 <= index < num_shards:
+            raise IndexError(f"Shard index {index} out of range for {num_shards} shards")
+        return self[index::num_shards]
+
+    def sample(self, num_samples: int, seed: Optional[int] = None) -> Sweep:
+        """
+        Return ``num_samples`` distinct variants drawn at random from this sweep. The same seed
+        gives the same samples in every process, so samples can be sharded afterwards.
+        """
+
+        indices = range(self.size) if self.indices is None else self.indices
+        rng = random.Random(seed)
+        return self.__subset(rng.sample(indices, min(num_samples, len(indices))))
@@ -1,3 +1,5 @@
 from .base import *
+from .backend import *
+from .schema import *
 from .utils import *
 from .yaml import *
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import pickle
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import yaml
+
+from .base import ConfigDict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+__all__ = [
+    "ConfigBackend",
+    "JSONBackend",
+    "PickleBackend",
+    "MsgpackBackend",
+    "register_backend",
+    "get_backend",
+]
+
+
+# Reserved keys of the JSON and msgpack formats. Values which are not native to the format are
+# stored as YAML documents, so they keep their tags (e.g. ``!!python/tuple`` or ``!object:``).
+# Config keys equal to a reserved key, after stripping leading escape characters, are escaped.
+LOCKED_KEY = "__locked__"
+YAML_VALUE_KEY = "__yaml__"
+YAML_VALUE_EXT_CODE = 1
+ESCAPE_CHAR = "\\"
+_RESERVED_KEYS = frozenset((LOCKED_KEY, YAML_VALUE_KEY))
+
+_BACKENDS: Dict[str, ConfigBackend] = {}
+_EXTENSIONS: Dict[str, str] = {}
+
+
+class ConfigBackend:
+    """
+    Serialization format of configs for ``load_config`` and ``save_config``.
+    ``Loader`` and ``Dumper`` are the YAML classes for values which need tags.
+    """
+
+    name: str = None
+    extensions = ()
+    binary: bool = False
+    # Keyword arguments of ``dump``. Other options of ``save_config`` (e.g. YAML-only ones) are not
+    # passed to the backend.
+    options = ()
+
+    def load(self, data: Union[str, bytes], Loader) -> ConfigDict:
+        raise NotImplementedError
+
+    def dump(self, config: ConfigDict, Dumper, **kwargs) -> Union[str, bytes]:
+        raise NotImplementedError
+
+
+def _is_reserved(key: Any) -> bool:
+    return key.__class__ is str and key.lstrip(ESCAPE_CHAR) in _RESERVED_KEYS
+
+
+def _is_escaped(key: Any) -> bool:
+    return _is_reserved(key) and key[0] == ESCAPE_CHAR
+
+
+def _encode_tree(config: ConfigDict, encode_other: Callable[[Any], Any]) -> dict:
+    # Convert a config to nested dicts and lists of native values. The lock state is only stored on
+    # the nodes where it differs from the parent, as locking a node locks its descendants.
+    def encode_node(node, locked, forced, parent_locked):
+        data = {
+            ESCAPE_CHAR + key if _is_reserved(key) else key: encode(child, node, locked, forced)
+            for key, child in dict.items(node)
+        }
+        if locked != parent_locked:
+            data[LOCKED_KEY] = locked
+        return data
+
+    def encode(value, node, locked, forced):
+        if isinstance(value, ConfigDict):
+            child_locked, child_forced = node._child_lock_state(value, forced)
+            return encode_node(value, child_locked, child_forced, locked)
+        elif value is None or value.__class__ in (str, int, float, bool):
+            return value
+        elif value.__class__ is list:
+            return [encode(item, node, locked, forced) for item in value]
+        else:
+            return encode_other(value)
+
+    return encode_node(config, config.is_locked(), None, False)
+
+
+class _TreeDecoder:
+    # Mappings are decoded bottom-up, so the lock states are applied top-down after decoding.
+    def __init__(self):
+        self.lock_states = []
+
+    def decode_mapping(self, data: dict) -> ConfigDict:
+        locked = data.pop(LOCKED_KEY, None)
+        if any(_is_escaped(key) for key in data):
+            data = {key[1:] if _is_escaped(key) else key: value for key, value in data.items()}
+        config = ConfigDict.from_nested(data)
+        if locked is not None:
+            self.lock_states.append((config, locked))
+        return config
+
+    def finish(self, config: ConfigDict) -> ConfigDict:
+        for node, locked in reversed(self.lock_states):
+            node.lock(mode=locked)
+        return config
+
+
+class JSONBackend(ConfigBackend):
+    name = "json"
+    extensions = (".json",)
+    options = ("indent", "sort_keys", "ensure_ascii", "separators", "allow_nan")
+
+    def load(self, data: Union[str, bytes], Loader) -> ConfigDict:
+        decoder = _TreeDecoder()
+
+        def object_hook(obj):
+            if len(obj) == 1 and YAML_VALUE_KEY in obj:
+                return yaml.load(obj[YAML_VALUE_KEY], Loader=Loader)
+            return decoder.decode_mapping(obj)
+
+        return decoder.finish(json.loads(data, object_hook=object_hook))
+
+    def dump(self, config: ConfigDict, Dumper, **kwargs) -> str:
+        def encode_other(value):
+            return {YAML_VALUE_KEY: yaml.dump(value, Dumper=Dumper)}
+
+        return json.dumps(_encode_tree(config, encode_other), **kwargs)
+
+
+class PickleBackend(ConfigBackend):
+    """
+    Binary format with pickle, which keeps any picklable value as is.
+    Only load pickles from trusted sources.
+    """
+
+    name = "pickle"
+    extensions = (".pkl", ".pickle")
+    binary = True
+    options = ("protocol",)
+
+    def load(self, data: bytes, Loader) -> ConfigDict:
+        return pickle.loads(data)
+
+    def dump(self, config: ConfigDict, Dumper, protocol: int = pickle.HIGHEST_PROTOCOL) -> bytes:
+        return pickle.dumps(config, protocol=protocol)
+
+
+class MsgpackBackend(ConfigBackend):
+    """
+    Binary format with msgpack, which is only available if ``msgpack`` is installed.
+    """
+
+    name = "msgpack"
+    extensions = (".msgpack", ".mpk")
+    binary = True
+    options = ("use_single_float", "strict_types", "datetime")
+
+    def load(self, data: bytes, Loader) -> ConfigDict:
+        def ext_hook(code, payload):
+            if code == YAML_VALUE_EXT_CODE:
+                return yaml.load(payload.decode("utf-8"), Loader=Loader)
+            return msgpack.ExtType(code, payload)
+
+        decoder = _TreeDecoder()
+        return decoder.finish(msgpack.unpackb(
+            data,
+            object_hook=decoder.decode_mapping,
+            ext_hook=ext_hook,
+            raw=False,
+            strict_map_key=False,
+        ))
+
+    def dump(self, config: ConfigDict, Dumper, **kwargs) -> bytes:
+        def encode_other(value):
+            if value.__class__ is bytes:
+                return value
+            payload = yaml.dump(value, Dumper=Dumper).encode("utf-8")
+            return msgpack.ExtType(YAML_VALUE_EXT_CODE, payload)
+
+        return msgpack.packb(_encode_tree(config, encode_other), use_bin_type=True, **kwargs)
+
+
+def register_backend(backend: ConfigBackend):
+    """
+    Register a backend by its name and file extensions, replacing existing ones.
+    """
+
+    _BACKENDS[backend.name] = backend
+    for extension in backend.extensions:
+        _EXTENSIONS[extension.lower()] = backend.name
+
+
+def get_backend(name: Optional[str] = None, path: Any = None) -> Optional[ConfigBackend]:
+    """
+    Return the backend of the given name, or the one registered for the extension of ``path``.
+    Return ``None`` for YAML, which is the default format.
+    """
+
+    if name is None and isinstance(path, (str, PathLike)):
+        name = _EXTENSIONS.get(Path(path).suffix.lower(), "yaml")
+    if name is None or name == "yaml":
+        return None
+    elif name not in _BACKENDS:
+        raise ValueError(f"Unknown config format '{name}'")
+    return _BACKENDS[name]
+
+
+register_backend(JSONBackend())
+register_backend(PickleBackend())
+if msgpack is not None:
+    register_backend(MsgpackBackend())
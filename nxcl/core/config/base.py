@@ -1,24 +1,34 @@
 from __future__ import annotations
 
-from typing import Iterable, Any, List, Tuple, Union
+import sys
+import types
+import hashlib
+import weakref
+from typing import TYPE_CHECKING, Iterable, Any, Callable, List, NamedTuple, Optional, Tuple, Union
 
 from textwrap import indent
+from functools import lru_cache
 from contextlib import contextmanager
-from collections.abc import Mapping
+from collections.abc import Mapping, KeysView, ValuesView, ItemsView
+
+if TYPE_CHECKING:
+    from .schema import ConfigSchema
 
 
 __all__ = [
     "ConfigDict",
+    "FrozenConfigDict",
+    "ConfigDiff",
+    "diff",
 ]
 
 
 SEPERATOR = "."
+KEY_CACHE_SIZE = 4096
 
+MERGE_STRATEGIES = ("override", "keep", "replace")
 
-# TODOs
-# - Type checking of values using ConfigValue
-# - Freezing of ConfigDict with FrozenConfigDict
-# - Reference values
+_MISSING = object()
 
 
 def is_valid_key(key) -> bool:
@@ -42,6 +52,36 @@ def tokenize_key(key: str) -> List[str]:
     return key.split(SEPERATOR)
 
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def compile_key(key: str) -> Tuple[str, ...]:
+    """
+    Validate and tokenize a (dotted) key into a tuple of interned atomic keys.
+    Results are cached per key string, evicting the least recently used ones.
+    """
+
+    if not is_valid_key(key):
+        raise KeyError(f"Invalid key '{key}'")
+    return tuple(sys.intern(sub_key) for sub_key in tokenize_key(key))
+
+
+def _is_same_value(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    elif type(a) is not type(b):
+        return False
+    try:
+        return bool(a == b)
+    except Exception:  # e.g. ambiguous truth value of arrays
+        return False
+
+
+def _compile_key(key) -> Tuple[str, ...]:
+    try:
+        return compile_key(key)
+    except TypeError:  # unhashable key
+        raise KeyError(f"Invalid key '{key}'") from None
+
+
 class ConfigDict(dict):
     """
     ConfigDict
@@ -53,6 +93,15 @@ class ConfigDict(dict):
         obj = super().__new__(cls)
         super(ConfigDict, obj).__setattr__("__children", {})
         super(ConfigDict, obj).__setattr__("__locked", False)
+        super(ConfigDict, obj).__setattr__("__parents", ())
+        super(ConfigDict, obj).__setattr__("__dirty", True)
+        super(ConfigDict, obj).__setattr__("__cache", None)
+        super(ConfigDict, obj).__setattr__("__index", None)
+        super(ConfigDict, obj).__setattr__("__shared", None)
+        super(ConfigDict, obj).__setattr__("__resolver", None)
+        super(ConfigDict, obj).__setattr__("__watchers", None)
+        super(ConfigDict, obj).__setattr__("__schema", None)
+        super(ConfigDict, obj).__setattr__("__frozen", False)
         return obj
 
     # TODO: support iterable as args
@@ -70,14 +119,11 @@ class ConfigDict(dict):
 
         for arg in args:
             if isinstance(arg, Mapping):
-                for key in arg:
-                    self.__set_value(key, arg[key], convert_mapping=convert_mapping)
+                self.__fill(arg, convert_mapping=convert_mapping)
             else:
                 raise TypeError(f"ConfigDict only accepts Mapping as arguments, not {type(arg)}.")
 
-        for key, value in kwargs.items():
-            self.__set_value(key, value, convert_mapping=convert_mapping)
-
+        self.__fill(kwargs, convert_mapping=convert_mapping)
         self.lock(mode=lock)
 
     def __super_getattr(self, key):
@@ -98,39 +144,340 @@ class ConfigDict(dict):
         # if not is_atomic_key(atomic_key):
         #     raise KeyError(f"Invalid atomic key '{atomic_key}'")
 
-        if super().__contains__(atomic_key):
-            return super().__getitem__(atomic_key)
-        else:
+        value = dict.get(self, atomic_key, _MISSING)
+        if value is _MISSING:
             raise KeyError(f"'{atomic_key}' not found.")
+        return value
+
+    def __get_unshared_child(self, atomic_key: str) -> Any:
+        value = self.__get_child(atomic_key)
+        if isinstance(value, ConfigDict):
+            if self.__dict__["__shared"]:
+                self.__detach()
+            if value.__dict__["__shared"]:
+                value = self.__own_child(value)
+        return value
 
     def __set_child(self, atomic_key: str, value: Any, convert_mapping: bool = True):
         # if not is_atomic_key(atomic_key):
         #     raise KeyError(f"Invalid atomic key '{atomic_key}'")
 
+        if self.__dict__["__frozen"]:
+            raise RuntimeError(f"Cannot set '{atomic_key}' in FrozenConfigDict.")
+        if self.__dict__["__shared"]:
+            self.__detach()
         if self.is_locked() and not super().__contains__(atomic_key):
             raise RuntimeError(f"Cannot add '{atomic_key}' in locked ConfigDict.")
 
         value = self.__convert_value(value, convert_mapping=convert_mapping)
+        binding = self.__dict__["__schema"]
+        if binding is not None:
+            schema, prefix = binding
+            value = schema.check_value(prefix + atomic_key, value)
+            if isinstance(value, ConfigDict):
+                value.__bind_schema(schema, prefix + atomic_key + SEPERATOR)
+        children = self.__super_getattr("children")
+        prev = children.get(atomic_key)
         if isinstance(value, ConfigDict):
-            self.__super_getattr("children")[atomic_key] = value
+            children[atomic_key] = value
+            value.__link(self)
         else:
-            self.__super_getattr("children").pop(atomic_key, None)
+            children.pop(atomic_key, None)
         super().__setitem__(atomic_key, value)
+        if prev is not None and prev is not value:
+            prev.__unlink(self)
+        self.__invalidate()
+        if self.__dict__["__watchers"]:
+            self.__notify(atomic_key)
+        return value
+
+    def __add_child(
+        self,
+        atomic_key: str,
+        value: Any,
+        convert_mapping: bool = True,
+        trusted: bool = False,
+    ):
+        # Fast path of __set_child for bulk construction. The caller guarantees that the key is a
+        # valid atomic key, which is not in this (unlocked) ConfigDict, and invalidates afterwards.
+        if isinstance(value, ConfigDict):
+            self.__dict__["__children"][atomic_key] = value
+            value.__link(self)
+        elif convert_mapping and isinstance(value, Mapping):
+            child = ConfigDict.__new__(ConfigDict)
+            child.__fill(value, trusted=trusted)
+            self.__dict__["__children"][atomic_key] = value = child
+            child.__link(self)
+        dict.__setitem__(self, atomic_key, value)
         return value
 
+    def __fill(self, mapping: Mapping, convert_mapping: bool = True, trusted: bool = False):
+        # Insert all items of a (nested) mapping in a single pass. Dotted and existing keys take the
+        # regular path, and keys of trusted input (e.g. from another ConfigDict) are not validated.
+        if self.__dict__["__frozen"]:
+            raise RuntimeError("Cannot update FrozenConfigDict.")
+        if self.__dict__["__shared"]:
+            self.__detach()
+        locked = self.is_locked()
+        checked = self.__dict__["__schema"] is not None
+        for key, value in mapping.items():
+            if (
+                not trusted and (not is_valid_key(key) or SEPERATOR in key)
+                or checked
+                or dict.__contains__(self, key)
+            ):
+                self.__set_value(key, value, convert_mapping=convert_mapping)
+            elif locked:
+                raise RuntimeError(f"Cannot add '{key}' in locked ConfigDict.")
+            else:
+                self.__add_child(key, value, convert_mapping=convert_mapping, trusted=trusted)
+        self.__invalidate()
+
     def __del_child(self, atomic_key: str):
         # if not is_atomic_key(atomic_key):
         #     raise KeyError(f"Invalid atomic key '{atomic_key}'")
 
+        if self.__dict__["__frozen"]:
+            raise RuntimeError(f"Cannot delete '{atomic_key}' in FrozenConfigDict.")
         if self.is_locked():
             raise RuntimeError(f"Cannot delete '{atomic_key}' in locked ConfigDict.")
 
+        if self.__dict__["__shared"]:
+            self.__detach()
         if super().__contains__(atomic_key):
-            self.__super_getattr("children").pop(atomic_key, None)
+            binding = self.__dict__["__schema"]
+            if binding is not None:
+                binding[0].check_delete(binding[1] + atomic_key)
+            prev = self.__super_getattr("children").pop(atomic_key, None)
             super().__delitem__(atomic_key)
+            if prev is not None:
+                prev.__unlink(self)
+            self.__invalidate()
+            if self.__dict__["__watchers"]:
+                self.__notify(atomic_key)
         else:
             raise KeyError(f"'{atomic_key}' not found.")
 
+    # Every node keeps weak references to the nodes that hold it, so that a mutation can drop the
+    # derived caches (e.g. the lookup index) of its ancestors. A node is marked dirty when it or one
+    # of its descendants changes, and a cache may only be stored on a node after every node it
+    # depends on is marked clean. Hence, invalidation can stop at the first dirty ancestor.
+    # A node rarely has more than one parent, so the references are kept in a tuple, which is much
+    # smaller than a dict, and the per-node caches are only allocated when they are first used.
+
+    def __link(self, parent: ConfigDict):
+        parents = self.__super_getattr("parents")
+        if self.__find_parent(id(parent)) is None:
+            self.__super_setattr("parents", parents + (weakref.ref(parent),))
+        if self.__dict__["__shared"]:
+            self.__dict__["__shared"].pop(id(parent), None)
+
+    def __unlink(self, parent: ConfigDict):
+        for value in parent.__super_getattr("children").values():
+            if value is self:  # still held by another key
+                return
+        self.__drop_parent(parent)
+        if self.__dict__["__shared"]:
+            self.__dict__["__shared"].pop(id(parent), None)
+
+    def __find_parent(self, parent_id: int) -> Optional[ConfigDict]:
+        for ref in self.__super_getattr("parents"):
+            parent = ref()
+            if parent is not None and id(parent) == parent_id:
+                return parent
+        return None
+
+    def __drop_parent(self, parent: ConfigDict):
+        # Dead references are dropped as well.
+        parents = self.__super_getattr("parents")
+        self.__super_setattr("parents", tuple(
+            ref for ref in parents if ref() is not parent and ref() is not None
+        ))
+
+    def _get_cached(self, key: Any, compute: Callable[[ConfigDict], Any]) -> Any:
+        """
+        Return ``compute(self)``, cached on this ConfigDict until it or any descendant is mutated.
+        ``compute`` must only depend on this subtree.
+        """
+
+        cache = self.__super_getattr("cache")
+        value = _MISSING if cache is None else cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute(self)
+
+            # The value depends on the whole subtree, so every node in it must be marked clean.
+            # Children with the same cached value were already cleaned when it was computed.
+            nodes = [self]
+            while nodes:
+                node = nodes.pop()
+                node.__super_setattr("dirty", False)
+                for child in node.__super_getattr("children").values():
+                    child_cache = child.__super_getattr("cache")
+                    if child_cache is None or key not in child_cache:
+                        nodes.append(child)
+
+            cache = self.__super_getattr("cache")
+            if cache is None:
+                cache = {}
+                self.__super_setattr("cache", cache)
+            cache[key] = value
+        return value
+
+    # Copy-on-write copies share their subtrees with the original, which keeps owning them. Each
+    # shared subtree records the copies (parents) that share it. A copy clones a shared subtree
+    # (shallowly, sharing its own children in turn) before it is mutated or handed out, and the
+    # original first gives every copy its own clone, so only the path to a mutated node is copied.
+    # Locking a copy does not clone anything either: the lock state is recorded on the share of
+    # each shared child, and applied to its whole subtree when the child is cloned.
+
+    def __clone(self) -> ConfigDict:
+        clone = ConfigDict.__new__(ConfigDict)
+        dict.update(clone, dict.items(self))
+        children = clone.__super_getattr("children")
+        children.update(self.__super_getattr("children"))
+        for child in children.values():
+            child.__link(clone)
+            if not child.__dict__["__frozen"]:  # immutable, so it is never cloned
+                shared = child.__super_getattr("shared")
+                if shared is None:
+                    shared = {}
+                    child.__super_setattr("shared", shared)
+                shared[id(clone)] = shared.get(id(self))
+        clone.__super_setattr("locked", self.is_locked())
+        clone.__super_setattr("schema", self.__super_getattr("schema"))
+        resolver = self.__super_getattr("resolver")
+        if resolver is not None:
+            clone.__super_setattr("resolver", resolver.copy(clone))
+        return clone
+
+    def __unshare(self, parent: ConfigDict) -> ConfigDict:
+        # Replace this shared ConfigDict in a copy by a clone, which applies the lock state recorded
+        # for the copy and the schema binding of the copy.
+        lock = self.__super_getattr("shared").pop(id(parent))
+        clone = self.__clone()
+        if lock is not None:
+            clone.lock(mode=lock)
+
+        children = parent.__super_getattr("children")
+        keys = [key for key, child in children.items() if child is self]
+        binding = parent.__super_getattr("schema")
+        if binding is not None:
+            binding = (binding[0], binding[1] + keys[0] + SEPERATOR)
+        if clone.__super_getattr("schema") != binding:
+            clone.__bind_schema(*(binding or (None, "")))
+
+        for key in keys:
+            children[key] = clone
+            dict.__setitem__(parent, key, clone)
+        clone.__link(parent)
+        self.__drop_parent(parent)
+        parent.__invalidate()
+        if parent.__dict__["__watchers"]:
+            for key in keys:
+                parent.__notify(key)
+        return clone
+
+    def __detach(self):
+        # Give every copy which shares this ConfigDict its own clone, before it is mutated or handed
+        # out by its owner.
+        shared = self.__super_getattr("shared")
+        for parent_id in list(shared or ()):
+            parent = self.__find_parent(parent_id)
+            if parent is None:
+                shared.pop(parent_id)
+            else:
+                self.__unshare(parent)
+
+    def __own_child(self, child: ConfigDict) -> ConfigDict:
+        if id(self) in (child.__dict__["__shared"] or ()):
+            return child.__unshare(self)
+        child.__detach()
+        return child
+
+    def _child_lock_state(
+        self,
+        child: ConfigDict,
+        forced: Optional[bool] = None,
+    ) -> Tuple[bool, Optional[bool]]:
+        """
+        Return the lock state of a child ConfigDict as seen from this ConfigDict, and the lock state
+        forced on the subtree of the child, e.g. by locking a copy-on-write copy. ``forced`` is the
+        lock state forced on this ConfigDict, if any.
+        """
+
+        if forced is None and child.__dict__["__shared"]:
+            forced = child.__dict__["__shared"].get(id(self))
+        if forced is None or child.__dict__["__frozen"]:
+            return child.is_locked(), forced
+        return forced, forced
+
+    def __invalidate(self):
+        if self.__dict__["__dirty"]:
+            return
+
+        nodes = [self]
+        while nodes:
+            state = nodes.pop().__dict__
+            state["__dirty"] = True
+            state["__cache"] = None
+            if state["__index"]:
+                state["__index"].clear()
+            for ref in state["__parents"]:
+                parent = ref()
+                if parent is not None and not parent.__dict__["__dirty"]:
+                    nodes.append(parent)
+
+    # Resolvers of references watch the atomic keys on the paths of the resolved references and of
+    # their dependencies. A watcher is called once when its key is set or deleted, and then dropped.
+
+    def _watch(self, key: str, token: Any, callback: Callable[[], Any]):
+        """
+        Call ``callback`` once when any atomic key on the path of ``key`` is set or deleted.
+        A callback registered again with the same ``token`` replaces the previous one.
+        """
+
+        cursor = self
+        for sub_key in _compile_key(key):
+            if not isinstance(cursor, ConfigDict):
+                break
+            watchers = cursor.__super_getattr("watchers")
+            if watchers is None:
+                watchers = {}
+                cursor.__super_setattr("watchers", watchers)
+            watchers.setdefault(sub_key, {})[token] = callback
+            cursor = dict.get(cursor, sub_key, _MISSING)
+
+    def __notify(self, atomic_key: str):
+        for callback in self.__super_getattr("watchers").pop(atomic_key, {}).values():
+            callback()
+
+    def __resolve(self, key: str, value: str) -> Any:
+        # Resolve a string value with references by the resolver of the nearest ancestor that has
+        # one. A node handed out to the user is not shared, so its first live parent is its parent.
+        resolver = self.__dict__["__resolver"]
+        if resolver is not None:
+            return resolver.resolve(key, value)
+
+        node = self
+        while True:
+            for ref in node.__super_getattr("parents"):
+                parent = ref()
+                if parent is not None:
+                    break
+            else:
+                return value
+
+            for parent_key, child in parent.__super_getattr("children").items():
+                if child is node:
+                    break
+            else:
+                return value
+
+            node, key = parent, parent_key + SEPERATOR + key
+            resolver = node.__dict__["__resolver"]
+            if resolver is not None:
+                return resolver.resolve(key, value)
+
     def __iter_children(self, recursive: bool = False) -> Tuple[str, Any]:
         for key, value in self.__super_getattr("children").items():
             if recursive:
@@ -139,60 +486,105 @@ class ConfigDict(dict):
             else:
                 yield key, value
 
-    def __iter_items(self, recursive: bool = False) -> Tuple[str, Any]:
-        for key, value in super().items():
-            if recursive and isinstance(value, ConfigDict):
-                for subkey, subvalue in value.__iter_items(recursive=recursive):
-                    yield SEPERATOR.join([key, subkey]), subvalue
-            else:
-                yield key, value
+    def __iter_items(self, recursive: bool = False) -> Iterable[Tuple[str, Any]]:
+        if recursive:
+            return _iter_flat_items(self)
+        else:
+            return iter(super().items())
 
     def __get_penultimate(
         self,
         key: str,
         create_if_not_exist: bool = False,
         none_if_not_exist: bool = False,
+        unshare: bool = False,
     ) -> Union[Tuple[ConfigDict, str], None]:
-        if not is_valid_key(key):
-            raise KeyError(f"Invalid key '{key}'")
-
-        sub_keys = tokenize_key(key)
+        sub_keys = _compile_key(key)
         cursor = self
+        if unshare and self.__dict__["__shared"]:
+            self.__detach()
 
-        for idx, sub_key in enumerate(sub_keys[:-1]):
-            if not isinstance(cursor, ConfigDict):
-                cur_key = SEPERATOR.join(sub_key[:idx])
-                raise KeyError(f"Invalid key '{key}': '{cur_key}' is not a ConfigDict.")
-            elif not super(ConfigDict, cursor).__contains__(sub_key):
+        for idx in range(len(sub_keys) - 1):
+            sub_key = sub_keys[idx]
+            child = dict.get(cursor, sub_key, _MISSING)
+            if child is _MISSING:
                 if create_if_not_exist:
-                    cursor = cursor.__set_child(sub_key, ConfigDict())
+                    child = cursor.__set_child(sub_key, ConfigDict())
                 elif none_if_not_exist:
                     return None
                 else:
-                    cur_key = SEPERATOR.join(sub_key[:idx])
+                    cur_key = SEPERATOR.join(sub_keys[:idx + 1])
                     raise KeyError(f"Invalid key '{key}': '{cur_key}' not found.")
-            else:
-                cursor = super(ConfigDict, cursor).__getitem__(sub_key)
+            elif not isinstance(child, ConfigDict):
+                if none_if_not_exist:
+                    return None
+                cur_key = SEPERATOR.join(sub_keys[:idx + 1])
+                raise KeyError(f"Invalid key '{key}': '{cur_key}' is not a ConfigDict.")
+            elif unshare and child.__dict__["__shared"]:
+                child = cursor.__own_child(child)
+            cursor = child
 
         return cursor, sub_keys[-1]
 
+    def __walk(self, key: str, mark_clean: bool = False) -> Any:
+        cursor = self
+        for sub_key in _compile_key(key):
+            if not isinstance(cursor, ConfigDict):
+                return _MISSING
+            if mark_clean:
+                cursor.__dict__["__dirty"] = False
+            cursor = dict.get(cursor, sub_key, _MISSING)
+            if cursor is _MISSING:
+                break
+        return cursor
+
+    def __lookup(self, key: str) -> Any:
+        index = self.__dict__["__index"]
+        if index is None:
+            return self.__walk(key)
+
+        try:
+            return index[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable key
+            raise KeyError(f"Invalid key '{key}'") from None
+
+        value = self.__walk(key, mark_clean=True)
+        index[key] = value
+        return value
+
     def __get_value(self, key: str) -> Any:
-        pen_node, pen_key = self.__get_penultimate(key)
-        return pen_node.__get_child(pen_key)
+        value = self.__lookup(key)
+        if value is _MISSING:
+            raise KeyError(f"'{key}' not found.")
+        elif isinstance(value, ConfigDict):
+            # The returned subtree can be mutated, so it must not be shared with other copies.
+            pen_node, pen_key = self.__get_penultimate(key, unshare=True)
+            value = pen_node.__get_unshared_child(pen_key)
+        elif value.__class__ is str and "${" in value:
+            value = self.__resolve(key, value)
+        return value
 
     def __set_value(self, key: str, value: Any, convert_mapping: bool = True):
-        pen_node, pen_key = self.__get_penultimate(key, create_if_not_exist=True)
+        pen_node, pen_key = self.__get_penultimate(key, create_if_not_exist=True, unshare=True)
         return pen_node.__set_child(pen_key, value, convert_mapping=convert_mapping)
 
     def __del_value(self, key: str):
-        pen_node, pen_key = self.__get_penultimate(key)
+        pen_node, pen_key = self.__get_penultimate(key, unshare=True)
         pen_node.__del_child(pen_key)
 
     def lock(self, mode: bool = True):
         if mode is True or mode is False:
+            if self.__dict__["__shared"]:
+                self.__detach()
             self.__super_setattr("locked", mode)
-            for _, child in self.__iter_children():
-                child.lock(mode=mode)
+            for child in list(self.__super_getattr("children").values()):
+                shared = child.__dict__["__shared"]
+                if shared and id(self) in shared:
+                    shared[id(self)] = mode
+                elif not child.__dict__["__frozen"]:  # always locked
+                    child.lock(mode=mode)
         else:
             raise ValueError(f"Invalid lock mode '{mode}'")
         return self
@@ -200,6 +592,17 @@ class ConfigDict(dict):
     def unlock(self):
         return self.lock(mode=False)
 
+    def _set_lock_state(self, mode: bool):
+        """
+        Lock or unlock only this ConfigDict, keeping the lock states of its subtrees.
+        """
+
+        if self.__dict__["__frozen"]:
+            raise RuntimeError("Cannot unlock FrozenConfigDict.")
+        if self.__dict__["__shared"]:
+            self.__detach()
+        self.__super_setattr("locked", mode)
+
     def is_locked(self) -> bool:
         return self.__super_getattr("locked")
 
@@ -215,11 +618,92 @@ class ConfigDict(dict):
     def unlocked(self):
         return self.locked(mode=False)
 
+    def use_index(self, mode: bool = True):
+        """
+        Memoize dotted key lookups on this ConfigDict in a flat index.
+        The index is dropped whenever this ConfigDict or any of its descendants is mutated.
+        """
+
+        if mode is True:
+            if self.__super_getattr("index") is None:
+                self.__super_setattr("index", {})
+        elif mode is False:
+            self.__super_setattr("index", None)
+        else:
+            raise ValueError(f"Invalid index mode '{mode}'")
+        return self
+
+    def is_indexed(self) -> bool:
+        return self.__super_getattr("index") is not None
+
+    def use_references(self, mode: bool = True):
+        """
+        Resolve ``${...}`` references in string values of this ConfigDict, e.g. ``${model.width}``,
+        ``${model.width * 2}`` or ``run-${seed}``, with keys relative to this ConfigDict.
+
+        References are resolved lazily on access and memoized, and a memoized value is invalidated
+        only when the reference or one of its (transitive) dependencies changes. Circular references
+        are detected when the dependency graph is built. Iteration, views and serialization keep the
+        unresolved strings.
+        """
+
+        if self.__dict__["__shared"]:
+            self.__detach()
+        if mode is True:
+            from .reference import ReferenceResolver
+            self.__super_setattr("resolver", ReferenceResolver(self))
+        elif mode is False:
+            self.__super_setattr("resolver", None)
+        else:
+            raise ValueError(f"Invalid reference mode '{mode}'")
+        return self
+
+    def uses_references(self) -> bool:
+        return self.__super_getattr("resolver") is not None
+
+    def use_schema(self, schema: Optional[Union[ConfigSchema, Mapping]]):
+        """
+        Validate this ConfigDict against a schema (a ConfigSchema or a mapping to compile into one)
+        in place, and check every later assignment or deletion of its keys. Only the changed key,
+        or the assigned subtree, is checked. ``None`` removes the schema.
+        """
+
+        if schema is not None:
+            from .schema import ConfigSchema
+            if not isinstance(schema, ConfigSchema):
+                schema = ConfigSchema(schema)
+            schema.validate(self)
+        self.__bind_schema(schema, "")
+        return self
+
+    def __bind_schema(self, schema: Optional[ConfigSchema], prefix: str):
+        # Children shared with other configs are bound when they are cloned.
+        if self.__dict__["__shared"]:
+            self.__detach()
+        self.__super_setattr("schema", None if schema is None else (schema, prefix))
+        for key, child in list(self.__super_getattr("children").items()):
+            if id(self) not in (child.__dict__["__shared"] or ()):
+                child.__bind_schema(schema, prefix + key + SEPERATOR)
+
+    def get_schema(self) -> Optional[ConfigSchema]:
+        binding = self.__super_getattr("schema")
+        return None if binding is None else binding[0]
+
     def __getitem__(self, key: str):
         return self.__get_value(key)
 
     def __getattr__(self, key: str):
-        return self.__get_child(key)
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            if key.startswith("__") and key.endswith("__"):  # e.g. __deepcopy__ of copy module
+                raise AttributeError(key)
+            raise KeyError(f"'{key}' not found.")
+        elif isinstance(value, ConfigDict):
+            if self.__dict__["__shared"] or value.__dict__["__shared"]:
+                value = self.__get_unshared_child(key)
+        elif value.__class__ is str and "${" in value:
+            value = self.__resolve(key, value)
+        return value
 
     def __setitem__(self, key: str, value: Any):
         try:
@@ -244,12 +728,7 @@ class ConfigDict(dict):
         self.__del_child(key)
 
     def __contains__(self, key: str) -> bool:
-        pen = self.__get_penultimate(key, none_if_not_exist=True)
-        if pen is None:
-            return False
-        else:
-            pen_node, pen_key = pen
-            return super(ConfigDict, pen_node).__contains__(pen_key)
+        return self.__lookup(key) is not _MISSING
 
     def __repr__(self):
         kvs = []
@@ -273,34 +752,139 @@ class ConfigDict(dict):
         }
         return state
 
+    # Kept to load pickles created before __reduce_ex__ was introduced.
     def __setstate__(self, state):
         self.__super_setattr("children", {})
         self.__super_setattr("locked", False)
-        self.update(state["__dict__"])
+        self.__super_setattr("parents", ())
+        self.__super_setattr("dirty", True)
+        self.__super_setattr("cache", None)
+        self.__super_setattr("index", None)
+        self.__super_setattr("shared", None)
+        self.__super_setattr("resolver", None)
+        self.__super_setattr("watchers", None)
+        self.__super_setattr("schema", None)
+        self.__super_setattr("frozen", False)
+        super().clear()
+        self.__fill(state["__dict__"], trusted=True)
 
         if state["__locked"] is True:
             self.lock()
 
-    def __iter__(self):
-        for key, _ in self.__iter_items():
-            yield key
+    def __reduce_ex__(self, protocol):
+        # The default protocol of dict subclasses pickles the items as well as the state, and
+        # replays them through __setitem__. Instead, the tree is sent once as a preorder sequence of
+        # keys with subtree sizes (-1 for leaves), and the leaf values, and is rebuilt in one pass.
+        # Subtrees are locked separately, so the positions of locked subtrees are sent as well, and
+        # so are the reference mode and the schema binding of the root, and the positions of
+        # FrozenConfigDict subtrees.
+        keys, shape, values, locked_nodes, frozen_nodes = [], [dict.__len__(self)], [], [], []
+        stack = [(iter(dict.items(self)), self, None)]
+        while stack:
+            items, node, forced = stack[-1]
+            for key, value in items:
+                keys.append(key)
+                if isinstance(value, ConfigDict):
+                    locked, sub_forced = node._child_lock_state(value, forced)
+                    if locked:
+                        locked_nodes.append(len(shape) - 1)
+                    if value.__dict__["__frozen"]:
+                        frozen_nodes.append(len(shape) - 1)
+                    shape.append(dict.__len__(value))
+                    stack.append((iter(dict.items(value)), value, sub_forced))
+                    break
+                shape.append(-1)
+                values.append(value)
+            else:
+                stack.pop()
+
+        return self.__class__._from_preorder, (
+            keys, shape, values, self.is_locked(), locked_nodes,
+            self.uses_references(), self.__super_getattr("schema"), frozen_nodes,
+        )
+
+    @classmethod
+    def _from_preorder(
+        cls,
+        keys: List[str],
+        shape: List[int],
+        values: List[Any],
+        locked: bool,
+        locked_nodes: Optional[List[int]] = None,
+        references: bool = False,
+        schema: Optional[Tuple[ConfigSchema, str]] = None,
+        frozen_nodes: Optional[List[int]] = None,
+    ):
+        config = ConfigDict.__new__(ConfigDict)
+        nodes, remaining = [config], [shape[0]]
+        values = iter(values)
+        subtrees = []
+
+        for key, size in zip(keys, shape[1:]):
+            while remaining[-1] == 0:
+                nodes.pop()
+                remaining.pop()
+            remaining[-1] -= 1
+
+            if size < 0:
+                dict.__setitem__(nodes[-1], key, next(values))
+            else:
+                parent = nodes[-1]
+                nodes.append(parent.__add_child(key, ConfigDict.__new__(ConfigDict)))
+                remaining.append(size)
+                subtrees.append((parent, key, nodes[-1]))
+
+        subtrees = dict(zip(
+            (index for index, size in enumerate(shape[1:]) if size >= 0), subtrees,
+        ))
+
+        # Frozen subtrees are rebuilt from the innermost one, so that their frozen subtrees are
+        # embedded as they are.
+        for index in reversed(frozen_nodes or ()):
+            parent, key, node = subtrees[index]
+            frozen = FrozenConfigDict(node)
+            parent.__super_getattr("children")[key] = frozen
+            dict.__setitem__(parent, key, frozen)
+            frozen.__link(parent)
+
+        # Pickles without ``locked_nodes`` only have the lock state of the root.
+        if locked_nodes is None:
+            if locked:
+                config.lock()
+        else:
+            config.__super_setattr("locked", locked)
+            for index in locked_nodes:
+                subtrees[index][2].__super_setattr("locked", True)
 
-    # TODO: Change implementation from list to dictview
+        # The config was valid when it was pickled, so it is not validated again.
+        if schema is not None:
+            config.__bind_schema(*schema)
+        if references:
+            config.use_references()
+        return config if cls is ConfigDict else cls(config)
 
-    def keys(self, flatten: bool = False) -> Iterable[str]:
-        return list(k for k, _ in self.__iter_items(recursive=flatten))
+    def __iter__(self):
+        return super().__iter__()
+
+    def keys(self, flatten: bool = False) -> ConfigKeysView:
+        return ConfigKeysView(self, flatten=flatten)
 
-    def values(self, flatten: bool = False) -> Iterable[Any]:
-        return list(v for _, v in self.__iter_items(recursive=flatten))
+    def values(self, flatten: bool = False) -> ConfigValuesView:
+        return ConfigValuesView(self, flatten=flatten)
 
-    def items(self, flatten: bool = False) -> Iterable[Tuple[str, Any]]:
-        return list((k, v) for k, v in self.__iter_items(recursive=flatten))
+    def items(self, flatten: bool = False) -> ConfigItemsView:
+        return ConfigItemsView(self, flatten=flatten)
 
     def get(self, key: str, default: Any = None) -> Any:
-        if key in self:
+        value = self.__lookup(key)
+        if value is _MISSING:
+            return default
+        elif isinstance(value, ConfigDict):
             return self.__get_value(key)
+        elif value.__class__ is str and "${" in value:
+            return self.__resolve(key, value)
         else:
-            return default
+            return value
 
     def pop(self, key: str, default: Any = None) -> Any:
         if self.is_locked():
@@ -317,44 +901,195 @@ class ConfigDict(dict):
         if self.is_locked():
             raise RuntimeError(f"Cannot clear locked ConfigDict.")
 
+        if self.__dict__["__shared"]:
+            self.__detach()
+        binding = self.__super_getattr("schema")
+        if binding is not None:
+            for key in dict.keys(self):
+                binding[0].check_delete(binding[1] + key)
+
+        children = self.__super_getattr("children")
+        for child in children.values():
+            child.__drop_parent(self)
         super().clear()
-        self.__super_getattr("children").clear()
+        children.clear()
+        self.__invalidate()
+        for key in list(self.__super_getattr("watchers") or ()):
+            self.__notify(key)
 
     def popitem(self) -> tuple[str, Any]:
         if self.is_locked():
             raise RuntimeError(f"Cannot popitem from locked ConfigDict.")
 
+        if self.__dict__["__shared"]:
+            self.__detach()
+        binding = self.__super_getattr("schema")
+        if binding is not None and len(self) > 0:
+            binding[0].check_delete(binding[1] + list(dict.keys(self))[-1])
+
         key, value = super().popitem()
         if isinstance(value, ConfigDict):
             self.__super_getattr("children").pop(key)
+            value.__unlink(self)
+        self.__invalidate()
+        if self.__dict__["__watchers"]:
+            self.__notify(key)
         return key, value
 
     def setdefault(self, key: str, default: Any) -> Any:
-        if key not in self:
+        value = self.__lookup(key)
+        if value is _MISSING:
             return self.__set_value(key, default)
-        else:
+        elif isinstance(value, ConfigDict):
             return self.__get_value(key)
+        elif value.__class__ is str and "${" in value:
+            return self.__resolve(key, value)
+        else:
+            return value
 
     # TODO: Same as __init__, support iterable as args
     def update(self, *args, convert_mapping: bool = True, **kwargs):
         for arg in args:
             if isinstance(arg, Mapping):
-                for key in arg:
-                    self.__set_value(key, arg[key], convert_mapping=convert_mapping)
+                self.__fill(arg, convert_mapping=convert_mapping)
             else:
                 raise TypeError(f"ConfigDict only accepts Mapping as arguments, not {type(arg)}.")
 
-        for key, value in kwargs.items():
-            self.__set_value(key, value, convert_mapping=convert_mapping)
+        self.__fill(kwargs, convert_mapping=convert_mapping)
+
+    @classmethod
+    def from_nested(cls, mapping: Mapping, lock: bool = False, trusted: bool = False) -> ConfigDict:
+        """
+        Build a ConfigDict from a nested mapping in a single pass.
+        Keys are not validated if ``trusted``, e.g. when they come from another ConfigDict.
+        Unlike the constructor, ConfigDict values are embedded without changing their lock.
+        """
+
+        config = cls.__new__(cls)
+        config.__fill(mapping, trusted=trusted)
+        return config.lock() if lock else config
+
+    @classmethod
+    def from_flat(cls, mapping: Mapping, lock: bool = False, trusted: bool = False) -> ConfigDict:
+        """
+        Build a ConfigDict from a mapping (or an iterable of pairs) of dotted keys in a single pass.
+        Keys are not validated if ``trusted``, e.g. when they come from another ConfigDict.
+        """
+
+        config = cls.__new__(cls)
+        items = mapping.items() if isinstance(mapping, Mapping) else mapping
+
+        # Consecutive keys usually share their prefix, so the path of the previous key is reused.
+        path, nodes = [], [config]
+        for key, value in items:
+            if trusted:
+                sub_keys = key.split(SEPERATOR)
+            elif is_valid_key(key):
+                sub_keys = tokenize_key(key)
+            else:
+                raise KeyError(f"Invalid key '{key}'")
+
+            depth, max_depth = 0, min(len(path), len(sub_keys) - 1)
+            while depth < max_depth and path[depth] == sub_keys[depth]:
+                depth += 1
+            del path[depth:], nodes[depth + 1:]
+
+            cursor = nodes[-1]
+            for sub_key in sub_keys[depth:-1]:
+                child = dict.get(cursor, sub_key, _MISSING)
+                if child is _MISSING:
+                    child = cursor.__add_child(sub_key, ConfigDict.__new__(ConfigDict))
+                elif not isinstance(child, ConfigDict):
+                    cur_key = SEPERATOR.join(sub_keys[:len(nodes)])
+                    raise KeyError(f"Invalid key '{key}': '{cur_key}' is not a ConfigDict.")
+                path.append(sub_key)
+                nodes.append(child)
+                cursor = child
+
+            if dict.__contains__(cursor, sub_keys[-1]):
+                cursor.__set_child(sub_keys[-1], value)
+            else:
+                cursor.__add_child(sub_keys[-1], value, trusted=trusted)
+                cursor.__invalidate()
+
+        return config.lock() if lock else config
+
+    def merge(self, other: Mapping, strategy: str = "override") -> ConfigDict:
+        """
+        Merge a (nested) mapping into this ConfigDict in place.
+
+        Only the keys of ``other`` are visited, and unchanged values are not written, so the cost
+        is proportional to the size of ``other``. Keys of ``other`` can be dotted keys.
+
+        Strategies:
+            - ``"override"``: merge subtrees recursively, and values of ``other`` win.
+            - ``"keep"``: merge subtrees recursively, but only add keys that do not exist yet.
+            - ``"replace"``: replace whole subtrees, like ``update``.
+        """
+
+        if strategy not in MERGE_STRATEGIES:
+            raise ValueError(f"Invalid merge strategy '{strategy}'")
+
+        self.__merge(other, strategy)
+        return self
+
+    def __merge(self, other: Mapping, strategy: str):
+        items = dict.items(other) if isinstance(other, ConfigDict) else other.items()
+        for key, value in items:
+            current = self.__lookup(key)
+            if current is _MISSING:
+                if isinstance(value, ConfigDict):
+                    value = value.copy(copy_on_write=True)
+                self.__set_value(key, value)
+            elif (
+                strategy != "replace"
+                and isinstance(current, ConfigDict)
+                and isinstance(value, Mapping)
+            ):
+                pen_node, pen_key = self.__get_penultimate(key, unshare=True)
+                pen_node.__get_unshared_child(pen_key).__merge(value, strategy)
+            elif strategy == "keep" or _is_same_value(current, value):
+                continue
+            else:
+                if isinstance(value, ConfigDict):
+                    value = value.copy(copy_on_write=True)
+                self.__set_value(key, value)
 
     @classmethod
     def fromkeys(cls, keys: Iterable[str], value: Any = None) -> ConfigDict:
         return ConfigDict(dict.fromkeys(keys, value))
 
     # FIXME: Improve this implementation
-    def copy(self, recursive: bool = False) -> ConfigDict:
+    def copy(self, recursive: bool = False, copy_on_write: bool = False) -> ConfigDict:
+        """
+        Copy the ConfigDict.
+
+        With ``copy_on_write=True``, the copy is as independent as a recursive copy, but subtrees
+        are shared with the original until they are mutated or accessed as a ConfigDict, and only
+        the path to such a subtree is cloned. The original keeps its subtrees, so a subtree
+        referenced before the copy still belongs to the original, but a subtree nested in it is
+        only unshared when it is reached through a ConfigDict.
+        """
+
+        if copy_on_write:
+            return self.__clone()
+
         kvs = dict(self.__iter_items(recursive=recursive))
-        return ConfigDict(**kvs).lock(mode=self.is_locked())
+        config = ConfigDict(**kvs).lock(mode=self.is_locked())
+        binding = self.__super_getattr("schema")
+        if binding is not None:
+            config.__bind_schema(*binding)
+        return config.use_references() if self.uses_references() else config
+
+    def fingerprint(self) -> str:
+        """
+        Return a stable digest of the content of this ConfigDict, which does not depend on the order
+        of keys. Digests of subtrees are cached, so after a mutation only the ancestors of the
+        changed value are hashed again. Subtrees with mutable leaves (e.g. lists), which can be
+        changed in place, are hashed again on every call.
+        """
+
+        return _digest_config(self).hex()
 
     # TODO: Improve this implementation
     def to_dict(self, flatten: bool = False):
@@ -367,6 +1102,470 @@ class ConfigDict(dict):
         return d
 
 
+
+def _iter_flat_items(config: ConfigDict) -> Iterable[Tuple[str, Any]]:
+    stack = [("", iter(dict.items(config)))]
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            if isinstance(value, ConfigDict):
+                stack.append((prefix + key + SEPERATOR, iter(dict.items(value))))
+                break
+            yield prefix + key, value
+        else:
+            stack.pop()
+
+
+def _encode_value(value: Any) -> bytes:
+    # Canonical encoding of a leaf for fingerprints, which is stable across processes.
+    # Sequences and sets are encoded regardless of their type, so frozen values keep their digest.
+    if value is None:
+        return b"n"
+    elif isinstance(value, bool):
+        return b"b1" if value else b"b0"
+    elif isinstance(value, int):
+        return b"i" + str(value).encode()
+    elif isinstance(value, float):
+        return b"f" + repr(value).encode()
+    elif isinstance(value, str):
+        return b"s" + value.encode("utf-8", "surrogatepass")
+    elif isinstance(value, bytes):
+        return b"y" + value
+    elif isinstance(value, ConfigDict):
+        return b"c" + _digest_config(value)
+    elif isinstance(value, (list, tuple)):
+        return b"l" + b"".join(hashlib.sha256(_encode_value(v)).digest() for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return b"e" + b"".join(sorted(hashlib.sha256(_encode_value(v)).digest() for v in value))
+    elif isinstance(value, Mapping):
+        return b"m" + b"".join(sorted(
+            hashlib.sha256(_encode_value(k)).digest() + hashlib.sha256(_encode_value(v)).digest()
+            for k, v in value.items()
+        ))
+    else:
+        cls = type(value)
+        return f"o{cls.__module__}.{cls.__qualname__}:{value!r}".encode()
+
+
+# Fast paths of _encode_value for the most common leaf types.
+_LEAF_ENCODERS = {
+    int: lambda value: b"i" + str(value).encode(),
+    float: lambda value: b"f" + repr(value).encode(),
+    str: lambda value: b"s" + value.encode("utf-8", "surrogatepass"),
+}
+
+
+def _compute_digest(config: ConfigDict) -> bytes:
+    # Keys and encoded values are length-prefixed, so the concatenation is unambiguous.
+    parts = []
+    for key in sorted(dict.keys(config)):
+        value = dict.__getitem__(config, key)
+        encoded_key = key.encode()
+        encoder = _LEAF_ENCODERS.get(value.__class__)
+        encoded_value = _encode_value(value) if encoder is None else encoder(value)
+        parts.append(len(encoded_key).to_bytes(4, "little") + encoded_key)
+        parts.append(len(encoded_value).to_bytes(4, "little") + encoded_value)
+    return hashlib.sha256(b"".join(parts)).digest()
+
+
+def _digest_config(config: ConfigDict) -> bytes:
+    if _has_mutable_leaves(config):
+        return _compute_digest(config)
+    return config._get_cached("fingerprint", _compute_digest)
+
+
+_IMMUTABLE_TYPES = (
+    type(None), bool, int, float, complex, str, bytes, type,
+    types.FunctionType, types.BuiltinFunctionType,
+)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(v) for v in value)
+    return isinstance(value, _IMMUTABLE_TYPES) or isinstance(value, FrozenConfigDict)
+
+
+def _compute_mutable(config: ConfigDict) -> bool:
+    for value in dict.values(config):
+        if isinstance(value, ConfigDict):
+            if _has_mutable_leaves(value):
+                return True
+        elif not _is_immutable(value):
+            return True
+    return False
+
+
+def _has_mutable_leaves(config: ConfigDict) -> bool:
+    # Leaves such as lists can be changed in place, which does not invalidate the caches of the
+    # subtree, so values derived from their content must not be cached.
+    return config._get_cached("mutable", _compute_mutable)
+
+
+def _count_leaves(config: ConfigDict) -> int:
+    # The count is cached on each node and dropped when the node or its descendants are mutated.
+    state = config.__dict__
+    cache = state["__cache"]
+    count = None if cache is None else cache.get("leaves")
+    if count is None:
+        count = dict.__len__(config)
+        for child in state["__children"].values():
+            count += _count_leaves(child) - 1
+        if state["__cache"] is None:
+            state["__cache"] = {}
+        state["__cache"]["leaves"] = count
+        state["__dirty"] = False
+    return count
+
+
+def _get_leaf(config: ConfigDict, key: Any) -> Any:
+    try:
+        value = config.get(key, _MISSING)
+    except KeyError:  # invalid key
+        return _MISSING
+    return _MISSING if isinstance(value, ConfigDict) else value
+
+
+class ConfigKeysView(KeysView):
+    """
+    Dynamic view on the keys of a ConfigDict.
+    With ``flatten=True``, it yields the dotted keys of all leaves.
+    """
+
+    __slots__ = ("_flatten",)
+
+    def __init__(self, config: ConfigDict, flatten: bool = False):
+        super().__init__(config)
+        self._flatten = flatten
+
+    def __len__(self) -> int:
+        if self._flatten:
+            return _count_leaves(self._mapping)
+        else:
+            return dict.__len__(self._mapping)
+
+    def __iter__(self):
+        if self._flatten:
+            for key, _ in _iter_flat_items(self._mapping):
+                yield key
+        else:
+            yield from dict.__iter__(self._mapping)
+
+    def __contains__(self, key: Any) -> bool:
+        if self._flatten:
+            return _get_leaf(self._mapping, key) is not _MISSING
+        else:
+            return dict.__contains__(self._mapping, key)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class ConfigValuesView(ValuesView):
+    """
+    Dynamic view on the values of a ConfigDict.
+    With ``flatten=True``, it yields the values of all leaves.
+    """
+
+    __slots__ = ("_flatten",)
+
+    def __init__(self, config: ConfigDict, flatten: bool = False):
+        super().__init__(config)
+        self._flatten = flatten
+
+    def __len__(self) -> int:
+        if self._flatten:
+            return _count_leaves(self._mapping)
+        else:
+            return dict.__len__(self._mapping)
+
+    def __iter__(self):
+        if self._flatten:
+            for _, value in _iter_flat_items(self._mapping):
+                yield value
+        else:
+            for key, value in dict.items(self._mapping):
+                yield self._mapping[key] if isinstance(value, ConfigDict) else value
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class ConfigItemsView(ItemsView):
+    """
+    Dynamic view on the items of a ConfigDict.
+    With ``flatten=True``, it yields the dotted keys and values of all leaves.
+    """
+
+    __slots__ = ("_flatten",)
+
+    def __init__(self, config: ConfigDict, flatten: bool = False):
+        super().__init__(config)
+        self._flatten = flatten
+
+    def __len__(self) -> int:
+        if self._flatten:
+            return _count_leaves(self._mapping)
+        else:
+            return dict.__len__(self._mapping)
+
+    def __iter__(self):
+        if self._flatten:
+            yield from _iter_flat_items(self._mapping)
+        else:
+            for key, value in dict.items(self._mapping):
+                yield key, self._mapping[key] if isinstance(value, ConfigDict) else value
+
+    def __contains__(self, item: Any) -> bool:
+        key, value = item
+        if self._flatten:
+            found = _get_leaf(self._mapping, key)
+        else:
+            found = dict.get(self._mapping, key, _MISSING)
+        return found is not _MISSING and (found is value or found == value)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class ConfigDiff(NamedTuple):
+    """
+    Dotted keys of the leaves that differ between two ConfigDicts.
+    """
+
+    changed: List[str]
+    added: List[str]
+    removed: List[str]
+
+
+def _flat_keys(prefix: str, config: ConfigDict) -> Iterable[str]:
+    return (prefix + key for key, _ in _iter_flat_items(config))
+
+
+def _is_same_subtree(a: ConfigDict, b: ConfigDict) -> bool:
+    # Fingerprints of subtrees with mutable leaves are not cached, so those are compared leaf by
+    # leaf instead of being hashed on every call.
+    if _has_mutable_leaves(a) or _has_mutable_leaves(b):
+        return False
+    return _digest_config(a) == _digest_config(b)
+
+
+def _diff(prefix: str, a: ConfigDict, b: ConfigDict, result: ConfigDiff):
+    for key, a_value in dict.items(a):
+        b_value = dict.get(b, key, _MISSING)
+        if a_value is b_value:  # e.g. subtrees shared by copy-on-write copies
+            continue
+
+        a_node, b_node = isinstance(a_value, ConfigDict), isinstance(b_value, ConfigDict)
+        if a_node and b_node:
+            if not _is_same_subtree(a_value, b_value):
+                _diff(prefix + key + SEPERATOR, a_value, b_value, result)
+        elif b_value is _MISSING:
+            if a_node:
+                result.removed.extend(_flat_keys(prefix + key + SEPERATOR, a_value))
+            else:
+                result.removed.append(prefix + key)
+        elif a_node or b_node:
+            if a_node:
+                result.removed.extend(_flat_keys(prefix + key + SEPERATOR, a_value))
+                result.added.append(prefix + key)
+            else:
+                result.removed.append(prefix + key)
+                result.added.extend(_flat_keys(prefix + key + SEPERATOR, b_value))
+        elif not _is_same_value(a_value, b_value):
+            result.changed.append(prefix + key)
+
+    for key, b_value in dict.items(b):
+        if not dict.__contains__(a, key):
+            if isinstance(b_value, ConfigDict):
+                result.added.extend(_flat_keys(prefix + key + SEPERATOR, b_value))
+            else:
+                result.added.append(prefix + key)
+
+
+def diff(a: ConfigDict, b: ConfigDict) -> ConfigDiff:
+    """
+    Compare the leaves of two ConfigDicts, as in ``items(flatten=True)``.
+    Subtrees that are shared (e.g. by copy-on-write copies), or whose cached fingerprints are equal,
+    are skipped without being visited.
+    """
+
+    result = ConfigDiff(changed=[], added=[], removed=[])
+    _diff("", a, b, result)
+    return result
+
+
+def _freeze_value(value: Any) -> Any:
+    if isinstance(value, FrozenConfigDict):
+        return value
+    elif isinstance(value, Mapping):
+        return FrozenConfigDict(value)
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(_freeze_value(v) for v in value)
+    else:
+        return value
+
+
+class FrozenConfigDict(ConfigDict):
+    """
+    Immutable ConfigDict.
+
+    All (dotted) keys are resolved once at construction into a flat lookup table,
+    and the structural hash is computed on demand and cached.
+    Lists and sets in values are converted to tuples and frozensets.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs and isinstance(args[0], ConfigDict):
+            config = args[0]
+        else:
+            config = ConfigDict(*args, **kwargs)
+
+        frozen = {key: _freeze_value(value) for key, value in dict.items(config)}
+        super().__init__(frozen, lock=True)
+
+        flat = {}
+        for key, value in dict.items(self):
+            flat[key] = value
+            if isinstance(value, FrozenConfigDict):
+                for sub_key, sub_value in value.__dict__["__flat"].items():
+                    flat[key + SEPERATOR + sub_key] = sub_value
+
+        super(ConfigDict, self).__setattr__("__flat", flat)
+        super(ConfigDict, self).__setattr__("__hash", None)
+        super(ConfigDict, self).__setattr__("__frozen", True)
+
+    def lock(self, mode: bool = True):
+        if mode is not True:
+            raise RuntimeError("Cannot unlock FrozenConfigDict.")
+        return super().lock(mode=mode)
+
+    def __getitem__(self, key: str):
+        try:
+            return self.__dict__["__flat"][key]
+        except KeyError:
+            raise KeyError(f"'{key}' not found.") from None
+        except TypeError:  # unhashable key
+            raise KeyError(f"Invalid key '{key}'") from None
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return key in self.__dict__["__flat"]
+        except TypeError:  # unhashable key
+            raise KeyError(f"Invalid key '{key}'") from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self.__dict__["__flat"].get(key, default)
+        except TypeError:  # unhashable key
+            raise KeyError(f"Invalid key '{key}'") from None
+
+    def __setitem__(self, key: str, value: Any):
+        raise RuntimeError(f"Cannot set '{key}' in FrozenConfigDict.")
+
+    def __setattr__(self, key: str, value: Any):
+        raise RuntimeError(f"Cannot set '{key}' in FrozenConfigDict.")
+
+    def __delitem__(self, key: str):
+        raise RuntimeError(f"Cannot delete '{key}' in FrozenConfigDict.")
+
+    def __delattr__(self, key: str):
+        raise RuntimeError(f"Cannot delete '{key}' in FrozenConfigDict.")
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        raise RuntimeError(f"Cannot pop '{key}' from FrozenConfigDict.")
+
+    def clear(self):
+        raise RuntimeError("Cannot clear FrozenConfigDict.")
+
+    def popitem(self) -> tuple[str, Any]:
+        raise RuntimeError("Cannot popitem from FrozenConfigDict.")
+
+    def setdefault(self, key: str, default: Any) -> Any:
+        raise RuntimeError(f"Cannot set '{key}' in FrozenConfigDict.")
+
+    def update(self, *args, **kwargs):
+        raise RuntimeError("Cannot update FrozenConfigDict.")
+
+    def merge(self, other: Mapping, strategy: str = "override") -> FrozenConfigDict:
+        raise RuntimeError("Cannot merge into FrozenConfigDict.")
+
+    def use_index(self, mode: bool = True):
+        raise RuntimeError("Cannot index FrozenConfigDict, whose lookups are already flat.")
+
+    def use_references(self, mode: bool = True):
+        raise RuntimeError("Cannot use references in FrozenConfigDict.")
+
+    def use_schema(self, schema: Optional[Union[ConfigSchema, Mapping]]):
+        raise RuntimeError("Cannot bind a schema to FrozenConfigDict.")
+
+    @classmethod
+    def from_nested(
+        cls,
+        mapping: Mapping,
+        lock: bool = True,
+        trusted: bool = False,
+    ) -> FrozenConfigDict:
+        if lock is not True:
+            raise RuntimeError("Cannot unlock FrozenConfigDict.")
+        return cls(ConfigDict.from_nested(mapping, trusted=trusted))
+
+    @classmethod
+    def from_flat(
+        cls,
+        mapping: Mapping,
+        lock: bool = True,
+        trusted: bool = False,
+    ) -> FrozenConfigDict:
+        if lock is not True:
+            raise RuntimeError("Cannot unlock FrozenConfigDict.")
+        return cls(ConfigDict.from_flat(mapping, trusted=trusted))
+
+    def __hash__(self) -> int:
+        value = self.__dict__["__hash"]
+        if value is None:
+            leaves, nodes = [], []
+            for key, sub_value in self.__dict__["__flat"].items():
+                if isinstance(sub_value, FrozenConfigDict):
+                    nodes.append(key)
+                else:
+                    leaves.append((key, sub_value))
+            value = hash((frozenset(leaves), frozenset(nodes)))
+            super(ConfigDict, self).__setattr__("__hash", value)
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        elif isinstance(other, FrozenConfigDict):
+            self_hash, other_hash = self.__dict__["__hash"], other.__dict__["__hash"]
+            if self_hash is not None and other_hash is not None and self_hash != other_hash:
+                return False
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        return "Frozen" + super().__repr__()
+
+    def __str__(self):
+        return "Frozen" + super().__str__()
+
+    def copy(self, recursive: bool = False, copy_on_write: bool = False) -> FrozenConfigDict:
+        return self
+
+    def as_configdict(self) -> ConfigDict:
+        """
+        Return a mutable ConfigDict with the same contents.
+        """
+
+        return ConfigDict(self.to_dict())
+
+
 # Need to implement or check
 # - __eq__
 # - __format__
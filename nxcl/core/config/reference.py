@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import re
+import ast
+import weakref
+from typing import Any, Dict, List, Set
+
+from .base import SEPERATOR, ConfigDict
+
+
+__all__ = [
+    "ReferenceResolver",
+]
+
+
+REFERENCE_PATTERN = re.compile(r"\$\{([^{}]+)\}")
+
+_MISSING = object()
+
+_FUNCTIONS = {
+    "abs": abs,
+    "bool": bool,
+    "float": float,
+    "int": int,
+    "len": len,
+    "max": max,
+    "min": min,
+    "round": round,
+    "str": str,
+}
+
+_ALLOWED_NODES = tuple(
+    node for node in (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Call,
+        ast.Name, ast.Attribute, ast.Subscript, ast.Slice, ast.Tuple, ast.List, ast.Constant,
+        getattr(ast, "Index", None), getattr(ast, "Num", None), getattr(ast, "Str", None),
+        getattr(ast, "NameConstant", None),
+        ast.operator, ast.unaryop, ast.boolop, ast.cmpop, ast.expr_context,
+    )
+    if node is not None
+)
+
+
+def _get_dotted_name(node: ast.AST):
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        prefix = _get_dotted_name(node.value)
+        return None if prefix is None else prefix + SEPERATOR + node.attr
+    else:
+        return None
+
+
+class _ReferenceTransformer(ast.NodeTransformer):
+    # Replace dotted names with local variables, which are bound to the referenced values.
+    def __init__(self):
+        self.deps = {}
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise ValueError(f"Unsupported function call in reference: {ast.dump(node.func)}")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node):
+        return self.visit_Attribute(node)
+
+    def visit_Attribute(self, node):
+        dotted_name = _get_dotted_name(node)
+        if dotted_name is None:
+            raise ValueError("Unsupported attribute access in reference")
+        name = self.deps.setdefault(dotted_name, f"_ref{len(self.deps)}")
+        return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+
+
+class Template:
+    """
+    Compiled string value with ``${...}`` references.
+
+    A value that is a single reference, e.g. ``${model.width * 2}``, evaluates to the value of the
+    expression, and other values interpolate the string of each expression.
+    Expressions can use dotted keys, literals, arithmetic, comparisons and a few builtins.
+    """
+
+    __slots__ = ("source", "deps", "names", "parts")
+
+    def __init__(self, source: str):
+        transformer = _ReferenceTransformer()
+        parts, end = [], 0
+
+        for match in REFERENCE_PATTERN.finditer(source):
+            if match.start() > end:
+                parts.append(source[end:match.start()])
+            expression = ast.parse(match.group(1).strip(), mode="eval")
+            for node in ast.walk(expression):
+                if not isinstance(node, _ALLOWED_NODES):
+                    raise ValueError(f"Unsupported expression in reference '{match.group(0)}'")
+            expression = ast.fix_missing_locations(transformer.visit(expression))
+            parts.append(compile(expression, match.group(0), "eval"))
+            end = match.end()
+
+        if end < len(source):
+            parts.append(source[end:])
+
+        self.source = source
+        self.deps = list(transformer.deps)
+        self.names = list(transformer.deps.values())
+        self.parts = parts
+
+    def evaluate(self, values: List[Any]) -> Any:
+        scope = dict(zip(self.names, values))
+        builtins = {"__builtins__": _FUNCTIONS}
+        if len(self.parts) == 1 and not isinstance(self.parts[0], str):
+            return eval(self.parts[0], builtins, scope)
+        else:
+            return "".join(
+                part if isinstance(part, str) else str(eval(part, builtins, scope))
+                for part in self.parts
+            )
+
+
+def is_template(value: Any) -> bool:
+    return value.__class__ is str and "${" in value
+
+
+class ReferenceResolver:
+    """
+    Lazily resolves and memoizes the ``${...}`` references of a ConfigDict.
+
+    The dependency graph is built and checked for cycles once. A resolved value is memoized until
+    a key on the path of the reference or of one of its dependencies is set or deleted, and then
+    only the affected references are invalidated, following the dependency edges. References which
+    depend on a subtree (directly or through other references) are resolved on every access, as
+    keys can be added anywhere in the subtree.
+    """
+
+    def __init__(self, config: ConfigDict, _graph=None):
+        self._config = weakref.ref(config)
+        self._values: Dict[str, Any] = {}
+        self._resolving: Set[str] = set()
+        self._volatile: Set[str] = set()
+
+        if _graph is not None:
+            templates, dependents = _graph
+            self._templates: Dict[str, Template] = dict(templates)
+            self._dependents: Dict[str, Set[str]] = {k: set(v) for k, v in dependents.items()}
+        else:
+            self._templates, self._dependents = {}, {}
+            for key, value in config.items(flatten=True):
+                if is_template(value):
+                    self._add_template(key, Template(value))
+            self._check_cycles(self._templates)
+
+    def copy(self, config: ConfigDict) -> ReferenceResolver:
+        return ReferenceResolver(config, _graph=(self._templates, self._dependents))
+
+    def _add_template(self, path: str, template: Template):
+        prev = self._templates.get(path)
+        if prev is not None:
+            for dep in prev.deps:
+                self._dependents.get(dep, set()).discard(path)
+        self._templates[path] = template
+        for dep in template.deps:
+            self._dependents.setdefault(dep, set()).add(path)
+
+    def _check_cycles(self, paths):
+        # Iterative depth-first search over the references reachable from the given paths.
+        done = set()
+        for start in paths:
+            if start in done:
+                continue
+            stack, trail = [(start, iter(self._templates[start].deps))], [start]
+            while stack:
+                path, deps = stack[-1]
+                for dep in deps:
+                    if dep in trail:
+                        cycle = trail[trail.index(dep):] + [dep]
+                        raise ValueError(f"Circular reference: {' -> '.join(cycle)}")
+                    elif dep in self._templates and dep not in done:
+                        stack.append((dep, iter(self._templates[dep].deps)))
+                        trail.append(dep)
+                        break
+                else:
+                    done.add(path)
+                    stack.pop()
+                    trail.pop()
+
+    def invalidate(self, path: str):
+        paths, visited = [path], set()
+        while paths:
+            path = paths.pop()
+            if path not in visited:
+                visited.add(path)
+                self._values.pop(path, None)
+                paths.extend(self._dependents.get(path, ()))
+
+    def resolve(self, path: str, source: str) -> Any:
+        """
+        Resolve the template string ``source`` found at ``path`` of the config.
+        """
+
+        value = self._values.get(path, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        config = self._config()
+        template = self._templates.get(path)
+        if template is None or template.source != source:
+            self._add_template(path, Template(source))
+            self._check_cycles([path])
+            template = self._templates[path]
+
+        if path in self._resolving:
+            raise ValueError(f"Circular reference: {path}")
+
+        self._resolving.add(path)
+        try:
+            values, volatile = [], False
+            for dep in template.deps:
+                if dep not in config:
+                    raise KeyError(f"Reference '{dep}' in '{path}' not found.")
+                dep_value = config[dep]
+                if isinstance(dep_value, ConfigDict) or dep in self._volatile:
+                    volatile = True
+                values.append(dep_value)
+            value = template.evaluate(values)
+        finally:
+            self._resolving.discard(path)
+
+        if volatile:
+            self._volatile.add(path)
+            return value
+        self._volatile.discard(path)
+
+        for watched in (path, *template.deps):
+            config._watch(watched, (id(self), watched), lambda p=watched: self.invalidate(p))
+
+        self._values[path] = value
+        return value
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .base import SEPERATOR, ConfigDict, _has_mutable_leaves
+
+
+__all__ = [
+    "ConfigValue",
+    "ConfigSchema",
+]
+
+
+_MISSING = object()
+
+_BOOL_STRINGS = {
+    "yes": True, "true": True, "t": True, "y": True, "1": True,
+    "no": False, "false": False, "f": False, "n": False, "0": False,
+}
+
+
+def _coerce_bool(value: Any) -> bool:
+    if isinstance(value, str) and value.lower() in _BOOL_STRINGS:
+        return _BOOL_STRINGS[value.lower()]
+    elif isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError
+
+
+def _coerce_int(value: Any) -> int:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    elif isinstance(value, str):
+        return int(value)
+    raise ValueError
+
+
+def _coerce_float(value: Any) -> float:
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError
+
+
+def _coerce_str(value: Any) -> str:
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise ValueError
+
+
+_COERCERS = {
+    bool: _coerce_bool,
+    int: _coerce_int,
+    float: _coerce_float,
+    str: _coerce_str,
+}
+
+
+def _apply_updates(config: ConfigDict, updates: List[Tuple[str, Any]]):
+    # Defaults are added even to locked subtrees. Only a node that gets a new key is unlocked, and
+    # only for the assignment, so the lock states of other subtrees are kept. A new subtree gets
+    # the lock state of its parent.
+    for path, value in updates:
+        prefix, _, key = path.rpartition(SEPERATOR)
+        node = config[prefix] if prefix else config
+        if not node.is_locked() or dict.__contains__(node, key):
+            node[key] = value
+            continue
+
+        node._set_lock_state(False)
+        try:
+            node[key] = value
+        finally:
+            node._set_lock_state(True)
+        value = dict.__getitem__(node, key)
+        if isinstance(value, ConfigDict):
+            value.lock()
+
+
+class ConfigValue:
+    """
+    Schema of a single value in a config.
+
+    Args:
+        type: Type or tuple of types of the value. Any type is allowed if ``None``.
+        default: Default value, which is filled in if the key is missing. The key is required if
+            there is no default.
+        choices: Allowed values.
+        validator: Callable that returns ``False`` or raises for invalid values.
+        nullable: Allow ``None``. Implied by a default of ``None``.
+        coerce: Convert values of other types, e.g. ``"0.1"`` to ``float``, if possible.
+    """
+
+    def __init__(
+        self,
+        type: Union[type, Tuple[type, ...], None] = None,
+        default: Any = _MISSING,
+        choices: Optional[Sequence[Any]] = None,
+        validator: Optional[Callable[[Any], Any]] = None,
+        nullable: bool = False,
+        coerce: bool = True,
+    ):
+        self.types = type if isinstance(type, tuple) or type is None else (type,)
+        self.default = default
+        self.choices = choices
+        self.validator = validator
+        self.nullable = nullable or default is None
+        self.coerce = coerce
+
+    @property
+    def required(self) -> bool:
+        return self.default is _MISSING
+
+    def __repr__(self):
+        types = None if self.types is None else [t.__name__ for t in self.types]
+        default = "<required>" if self.required else repr(self.default)
+        return f"ConfigValue(type={types}, default={default})"
+
+    def compile(self) -> Callable[[Any], Any]:
+        """
+        Compile this schema into a function, which returns the (coerced) value or raises.
+        """
+
+        types, choices, validator = self.types, self.choices, self.validator
+        nullable = self.nullable
+        coercers = [_COERCERS[t] for t in (types or ()) if t in _COERCERS] if self.coerce else []
+        reject_bool = types is not None and bool not in types
+
+        def check(value: Any) -> Any:
+            if value is None:
+                if nullable:
+                    return None
+                raise TypeError("None is not allowed")
+
+            if types is not None and (
+                not isinstance(value, types) or reject_bool and value.__class__ is bool
+            ):
+                for coercer in coercers:
+                    try:
+                        value = coercer(value)
+                        break
+                    except (TypeError, ValueError):
+                        pass
+                else:
+                    names = ", ".join(t.__name__ for t in types)
+                    raise TypeError(f"Expected {names}, got {type(value).__name__} {value!r}")
+
+            if choices is not None and value not in choices:
+                raise ValueError(f"{value!r} is not one of {list(choices)}")
+            if validator is not None and validator(value) is False:
+                raise ValueError(f"Invalid value {value!r}")
+            return value
+
+        return check
+
+
+def _expected_mapping(value: Any) -> str:
+    return f"Expected a mapping, got {type(value).__name__} {value!r}"
+
+
+def _to_config_value(value: Any) -> ConfigValue:
+    if isinstance(value, ConfigValue):
+        return value
+    elif isinstance(value, type) or (
+        isinstance(value, tuple) and all(isinstance(v, type) for v in value)
+    ):
+        return ConfigValue(type=value)
+    elif value is None:
+        return ConfigValue(default=None)
+    else:
+        return ConfigValue(type=type(value), default=value)
+
+
+class ConfigSchema:
+    """
+    Schema of a config, compiled once into a flat table of checks keyed by dotted keys.
+
+    A schema is a nested mapping, where leaves are ``ConfigValue``, types (required values of the
+    type), or default values (optional values of the type of the default).
+
+    ``validate`` checks a whole config in a single pass. The results are cached on unchanged
+    subtrees, so validating copy-on-write variants of a config only visits their changed paths.
+    Subtrees with mutable leaves (e.g. lists), which can be changed in place, are always checked.
+    With ``ConfigDict.use_schema``, only the changed keys are checked on each assignment.
+    If ``strict``, keys which are not in the schema are rejected.
+    """
+
+    def __init__(self, schema: Mapping, strict: bool = False):
+        self.schema = schema
+        self.strict = strict
+        self.checks: Dict[str, Callable[[Any], Any]] = {}
+        self.defaults: Dict[str, Dict[str, Any]] = {}
+        self.required: Dict[str, List[str]] = {}
+
+        stack = [("", schema)]
+        while stack:
+            prefix, mapping = stack.pop()
+            defaults, required = {}, []
+            for key, value in mapping.items():
+                path = prefix + key
+                if isinstance(value, Mapping):
+                    stack.append((path + SEPERATOR, value))
+                    required.append(key)
+                else:
+                    value = _to_config_value(value)
+                    self.checks[path] = value.compile()
+                    if value.required:
+                        required.append(key)
+                    else:
+                        defaults[key] = value.default
+            self.defaults[prefix] = defaults
+            self.required[prefix] = required
+
+    def __repr__(self):
+        return f"ConfigSchema({list(self.checks)})"
+
+    def __reduce__(self):
+        # Checks are compiled into closures, so the schema is compiled again when it is unpickled.
+        return self.__class__, (self.schema, self.strict)
+
+    def __check_node(
+        self,
+        config: ConfigDict,
+        prefix: str,
+    ) -> Tuple[List[str], List[Tuple[str, Any]]]:
+        errors, updates = [], []
+        checks, strict = self.checks, self.strict
+
+        for key, value in dict.items(config):
+            path = prefix + key
+            if path + SEPERATOR in self.required:
+                if isinstance(value, ConfigDict):
+                    sub_errors, sub_updates = self.check_subtree(value, path + SEPERATOR)
+                    errors.extend(sub_errors)
+                    updates.extend(sub_updates)
+                else:
+                    errors.append(f"{path}: {_expected_mapping(value)}")
+                continue
+
+            check = checks.get(path)
+            if check is None:
+                if strict:
+                    errors.append(f"{path}: Unknown key")
+                continue
+
+            try:
+                checked = check(value)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{path}: {e}")
+            else:
+                if checked is not value:
+                    updates.append((path, checked))
+
+        for key in self.required.get(prefix, ()):
+            if not dict.__contains__(config, key):
+                errors.append(f"{prefix + key}: Missing required key")
+        for key, default in self.defaults.get(prefix, {}).items():
+            if not dict.__contains__(config, key):
+                updates.append((prefix + key, default))
+
+        return errors, updates
+
+    def check_subtree(
+        self,
+        config: ConfigDict,
+        prefix: str = "",
+    ) -> Tuple[List[str], List[Tuple[str, Any]]]:
+        """
+        Check a subtree at ``prefix`` (a dotted key with a trailing separator, or ``""``) without
+        modifying it. Return the errors, and the coerced values and defaults to be set.
+        """
+
+        # Leaves such as lists can be changed in place, so results on their subtrees are not cached.
+        if _has_mutable_leaves(config):
+            return self.__check_node(config, prefix)
+        return config._get_cached(("schema", self, prefix), lambda c: self.__check_node(c, prefix))
+
+    def check_value(self, path: str, value: Any) -> Any:
+        """
+        Check a value to be set at ``path``, and return the (coerced) value to set.
+        """
+
+        if path + SEPERATOR in self.required:
+            if not isinstance(value, ConfigDict):
+                raise TypeError(f"{path}: {_expected_mapping(value)}")
+            errors, updates = self.check_subtree(value, path + SEPERATOR)
+            if errors:
+                raise ValueError("Invalid config:\n" + "\n".join(f"  - {e}" for e in errors))
+            _apply_updates(value, [(key[len(path) + 1:], update) for key, update in updates])
+            return value
+
+        check = self.checks.get(path)
+        if check is None:
+            if self.strict:
+                raise KeyError(f"'{path}' is not in the schema.")
+            return value
+
+        try:
+            return check(value)
+        except (TypeError, ValueError) as e:
+            raise type(e)(f"{path}: {e}") from None
+
+    def check_delete(self, path: str):
+        prefix, _, key = path.rpartition(SEPERATOR)
+        if key in self.required.get(prefix + SEPERATOR if prefix else "", ()):
+            raise KeyError(f"Cannot delete required key '{path}'.")
+
+    def validate(self, config: ConfigDict) -> ConfigDict:
+        """
+        Validate a config in place, filling in defaults and coerced values. Raise ``ValueError``
+        with every error if the config is invalid.
+        """
+
+        errors, updates = self.check_subtree(config)
+        if errors:
+            raise ValueError("Invalid config:\n" + "\n".join(f"  - {e}" for e in errors))
+
+        _apply_updates(config, updates)
+        return config
+
+    def is_valid(self, config: ConfigDict) -> bool:
+        return not self.check_subtree(config)[0]
@@ -1,49 +1,551 @@
+import os
+import uuid
+import pickle
+import hashlib
+import weakref
+import tempfile
 from os import PathLike
 from pathlib import Path
+from textwrap import indent
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 import yaml
 
-from .base import ConfigDict
-from .yaml import NXCLLoader, NXCLDumper
+from .base import ConfigDict, _has_mutable_leaves
+from .backend import get_backend
+from .yaml import NXCLCLoader, NXCLCDumper, _get_path_registry_key
 
 
 __all__ = [
     "load_config",
+    "iter_configs",
     "save_config",
+    "clear_config_cache",
+    "load_configs",
+    "iter_load_configs",
 ]
 
 
-# TODOs
-# - Support stream as file input.
+# Options of yaml.dump that keep a block mapping equal to the concatenation of its entries.
+_INCREMENTAL_YAML_KWARGS = {"sort_keys", "indent", "width", "allow_unicode", "default_flow_style"}
+_FRAGMENT_TOKEN = "nxcl-fragment-" + uuid.uuid4().hex
+_FRAGMENT_DUMPERS = {}
 
+MEMORY_CACHE_SIZE = 128
+_MEMORY_CACHE = OrderedDict()
 
-def load_config(file: PathLike, Loader=NXCLLoader) -> ConfigDict:
+# Digests of the last incremental saves by path, evicting the least recently saved ones.
+SAVED_CACHE_SIZE = 128
+_LAST_SAVED = OrderedDict()
+
+
+def _get_fragment_dumper(Dumper):
+    # Fragments are dumped separately, so anchors cannot be shared between them.
+    if Dumper not in _FRAGMENT_DUMPERS:
+        _FRAGMENT_DUMPERS[Dumper] = type(Dumper.__name__, (Dumper,), {
+            "ignore_aliases": lambda self, data: True,
+        })
+    return _FRAGMENT_DUMPERS[Dumper]
+
+
+def _dump_fragment(config: ConfigDict, Dumper, yaml_kwargs: dict) -> str:
+    # Non-empty subtrees are dumped as placeholders, which are replaced by their (cached) fragments.
+    # Fragments are dumped at column zero, so their width is reduced by the indentation they get.
+    spaces = " " * (yaml_kwargs.get("indent") or 2)
+    width = yaml_kwargs.get("width") or 80
+    child_kwargs = {**yaml_kwargs, "width": max(width - len(spaces), 2 * len(spaces) + 1)}
+
+    shallow, fragments = {}, {}
+    for key, value in dict.items(config):
+        if isinstance(value, ConfigDict) and len(value) > 0:
+            token = f"{_FRAGMENT_TOKEN}-{len(fragments)}"
+            fragments[token] = _get_fragment(value, Dumper, child_kwargs)
+            shallow[key] = token
+        else:
+            shallow[key] = value
+
+    text = yaml.dump(shallow, Dumper=_get_fragment_dumper(Dumper), **yaml_kwargs)
+    for token, fragment in fragments.items():
+        text = text.replace(f" {token}\n", "\n" + indent(fragment, spaces), 1)
+    return text
+
+
+def _get_fragment(config: ConfigDict, Dumper, yaml_kwargs: dict) -> str:
+    if _has_mutable_leaves(config):
+        return _dump_fragment(config, Dumper, yaml_kwargs)
+    key = ("yaml", Dumper, tuple(sorted(yaml_kwargs.items())))
+    return config._get_cached(key, lambda c: _dump_fragment(c, Dumper, yaml_kwargs))
+
+
+def _dump_incremental(config: ConfigDict, Dumper, yaml_kwargs: dict) -> Optional[str]:
+    if (
+        not set(yaml_kwargs) <= _INCREMENTAL_YAML_KWARGS
+        or yaml_kwargs.get("default_flow_style", False) is not False
+        or type(config) is not ConfigDict
+    ):
+        return None
+    return _get_fragment(config, Dumper, yaml_kwargs)
+
+
+def _get_cache_dir(cache_dir: Optional[PathLike]) -> Path:
+    if cache_dir is None:
+        cache_dir = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")) / "nxcl" / "configs"
+    return Path(cache_dir).expanduser()
+
+
+def _get_cache_path(cache_dir: Path, key: tuple) -> Path:
+    return cache_dir / (hashlib.sha256(repr(key).encode()).hexdigest() + ".pkl")
+
+
+def _stat_files(paths: List[Path]) -> List[Tuple[str, int, int]]:
+    stats = []
+    for path in paths:
+        stat = path.stat()
+        stats.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return stats
+
+
+def _is_fresh(stats: List[Tuple[str, int, int]]) -> bool:
+    try:
+        for path, mtime, size in stats:
+            stat = os.stat(path)
+            if stat.st_mtime_ns != mtime or stat.st_size != size:
+                return False
+    except OSError:
+        return False
+    return True
+
+
+def _load_cached(key: tuple, use_disk: bool, cache_dir: Optional[PathLike]) -> Optional[ConfigDict]:
+    # Configs are cached as pickles, so every hit is unpickled into new objects, which do not share
+    # mutable values with the configs returned before.
+    entry = _MEMORY_CACHE.get(key)
+    if entry is not None:
+        stats, data = entry
+        if _is_fresh(stats):
+            _MEMORY_CACHE.move_to_end(key)
+            return pickle.loads(data)
+        del _MEMORY_CACHE[key]
+
+    if use_disk:
+        cache_path = _get_cache_path(_get_cache_dir(cache_dir), key)
+        try:
+            with cache_path.open("rb") as f:
+                cached_key, stats, data = pickle.load(f)
+            if cached_key == key and isinstance(data, bytes) and _is_fresh(stats):
+                config = pickle.loads(data)
+            else:
+                return None
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+        _store_memory(key, stats, data)
+        return config
+
+    return None
+
+
+def _store_memory(key: tuple, stats: List[Tuple[str, int, int]], data: bytes):
+    _MEMORY_CACHE[key] = (stats, data)
+    _MEMORY_CACHE.move_to_end(key)
+    while len(_MEMORY_CACHE) > MEMORY_CACHE_SIZE:
+        _MEMORY_CACHE.popitem(last=False)
+
+
+def _store_cached(
+    key: tuple,
+    stats: List[Tuple[str, int, int]],
+    config: ConfigDict,
+    use_disk: bool,
+    cache_dir: Optional[PathLike],
+):
+    data = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+    _store_memory(key, stats, data)
+
+    if use_disk:
+        cache_dir = _get_cache_dir(cache_dir)
+        cache_path = _get_cache_path(cache_dir, key)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, stats, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass
+
+
+def _write_file(
+    path: Path,
+    data: Union[str, bytes],
+    atomic: bool = False,
+    fsync: bool = False,
+) -> bool:
+    # Atomic writes skip unchanged files, and otherwise write a temporary file in the same directory
+    # and rename it over the file, so readers see either the old or the new file. Return whether
+    # the file was written. A symbolic link is kept, and the file it points to is replaced.
+    if not atomic:
+        with path.open("wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        return True
+
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    path = Path(os.path.realpath(path))
+    try:
+        stat = path.stat()
+    except OSError:
+        stat = None
+    if stat is not None and stat.st_size == len(data) and path.read_bytes() == data:
+        return False
+
+    # The temporary file is created like a new file, so the umask applies to its mode, and it gets
+    # the mode of the file it replaces, if any.
+    temp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, "xb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if stat is not None:
+            os.chmod(temp_path, stat.st_mode & 0o7777)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        # The rename is only durable once the directory is synced as well.
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return True
+
+
+def clear_config_cache(cache_dir: Optional[PathLike] = None, disk: bool = True):
     """
-    Load config from file.
+    Clear the in-process cache of ``load_config``, and its on-disk cache if ``disk``.
+    The records of incremental saves are cleared as well, so the next ``save_config`` with
+    ``incremental`` writes the file.
     """
 
-    path = Path(file).expanduser()
+    _MEMORY_CACHE.clear()
+    _LAST_SAVED.clear()
+    if disk:
+        cache_dir = _get_cache_dir(cache_dir)
+        if cache_dir.exists():
+            for cache_path in cache_dir.glob("*.pkl"):
+                cache_path.unlink()
+
 
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
+ConfigSource = Union[PathLike, str, bytes, bytearray, memoryview, IO]
 
-    with path.open("r") as f:
-        config = yaml.load(f, Loader=Loader)
 
+@contextmanager
+def _open_config(file: ConfigSource, binary: bool = False):
+    # Paths are opened, buffers are read in place, and file objects (including mmap) are streamed.
+    if isinstance(file, (str, PathLike)):
+        path = Path(file).expanduser()
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        with path.open("rb" if binary else "r") as f:
+            yield f
+    elif isinstance(file, bytes):
+        yield file
+    elif isinstance(file, (bytearray, memoryview)):
+        yield bytes(file)
+    elif hasattr(file, "read"):
+        yield file
+    else:
+        raise TypeError(f"Invalid config source: {type(file)}")
+
+
+def _check_config(config, fingerprint_configs: Optional[List[ConfigDict]]) -> ConfigDict:
     if not isinstance(config, ConfigDict):
         raise TypeError(f"Invalid config: the root of config should be mapping, got {type(config)}")
 
+    if fingerprint_configs is not None:
+        for constructed in reversed(fingerprint_configs):
+            constructed.fingerprint()
+        config.fingerprint()
     return config
 
 
-def save_config(config: ConfigDict, file: PathLike, Dumper=NXCLDumper, **yaml_kwargs):
+def load_config(
+    file: ConfigSource,
+    Loader=NXCLCLoader,
+    fingerprint: bool = False,
+    cache: Union[bool, str] = False,
+    cache_dir: Optional[PathLike] = None,
+    format: Optional[str] = None,
+) -> ConfigDict:
     """
-    Save config to file.
+    Load config from a file path, a file object (text or binary, e.g. ``mmap``) or a byte buffer.
+    The default loader is backed by libyaml if it is available.
+
+    The ``format`` (e.g. ``"yaml"``, ``"json"``, ``"pickle"`` or ``"msgpack"``) is chosen by the
+    extension of the path if not given, and defaults to YAML. ``Loader`` is also used for tagged
+    values in other formats.
+
+    If ``fingerprint``, the digests of ``ConfigDict.fingerprint`` are computed for every subtree
+    as it is constructed, from the children up, so the fingerprint of the loaded config is free.
+
+    If ``cache`` is ``True``, parsed configs are cached in-process (LRU) and on disk under
+    ``cache_dir`` (default: ``$XDG_CACHE_HOME/nxcl/configs``) as pickles, and with ``"memory"``
+    only in-process. Entries are keyed by the resolved path, modification time and size of the
+    file, the loader class, the working directory, and the path aliases and search paths, and are
+    invalidated when any of the (transitively) included files changes. Every call returns a new config, unpickled from the
+    cache, which shares no values with other calls.
+    Only enable the disk cache in a cache directory that nobody else can write to.
+    Only paths can be cached.
     """
 
-    yaml_kwargs.setdefault("sort_keys", False)
+    if cache not in (False, True, "memory"):
+        raise ValueError(f"Invalid cache mode '{cache}'")
+
+    backend = get_backend(format, file)
+
+    if cache:
+        if not isinstance(file, (str, PathLike)):
+            raise TypeError("Only configs loaded from a path can be cached.")
+
+        path = Path(file).expanduser()
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+
+        path = path.resolve()
+        stat = path.stat()
+        key = (
+            str(path), stat.st_mtime_ns, stat.st_size,
+            f"{Loader.__module__}.{Loader.__qualname__}", os.getcwd(),
+            None if backend is None else backend.name, _get_path_registry_key(),
+        )
+        config = _load_cached(key, cache is True, cache_dir)
+        if config is not None:
+            if fingerprint:
+                config.fingerprint()
+            return config
+
+    if backend is not None:
+        with _open_config(file, binary=backend.binary) as stream:
+            config = backend.load(stream if isinstance(stream, bytes) else stream.read(), Loader)
+        config = _check_config(config, [] if fingerprint else None)
+        included_paths = []
+    else:
+        with _open_config(file) as stream:
+            loader = Loader(stream)
+            if fingerprint:
+                loader.constructed_configs = []
+            if cache:
+                loader.included_paths = []
+            try:
+                config = loader.get_single_data()
+            finally:
+                loader.dispose()
+        config = _check_config(config, loader.constructed_configs if fingerprint else None)
+        included_paths = loader.included_paths or []
+
+    if cache:
+        stats = [(str(path), stat.st_mtime_ns, stat.st_size)] + _stat_files(included_paths)
+        _store_cached(key, stats, config, cache is True, cache_dir)
+
+    return config
+
+
+def iter_configs(
+    file: ConfigSource,
+    Loader=NXCLCLoader,
+    fingerprint: bool = False,
+) -> Iterator[ConfigDict]:
+    """
+    Lazily load every document of a multi-document YAML stream as a config. The stream is read
+    incrementally, so only the current document is kept in memory. Empty documents are skipped.
+    """
+
+    with _open_config(file) as stream:
+        loader = Loader(stream)
+        try:
+            while loader.check_data():
+                if fingerprint:
+                    loader.constructed_configs = []
+                config = loader.get_data()
+                if config is not None:
+                    yield _check_config(config, loader.constructed_configs if fingerprint else None)
+        finally:
+            loader.dispose()
+
+
+def _load_config_chunk(chunk: List[Tuple[int, PathLike]], Loader, cache) -> List[tuple]:
+    # Runs in worker processes. Configs are sent back in the compact preorder format of pickle, and
+    # exceptions which cannot be pickled are replaced, so one bad file does not break the batch.
+    results = []
+    for index, path in chunk:
+        try:
+            results.append((index, load_config(path, Loader=Loader, cache=cache), None))
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            results.append((index, None, e))
+    return results
+
+
+def _iter_load_results(
+    paths: List[PathLike],
+    workers: Optional[int],
+    Loader,
+    cache: Union[bool, str],
+    chunksize: Optional[int],
+) -> Iterator[Tuple[int, Optional[ConfigDict], Optional[Exception]]]:
+    workers = workers or os.cpu_count() or 1
+    indexed = list(enumerate(paths))
+
+    if workers <= 1 or len(indexed) <= 1:
+        for item in indexed:
+            yield from _load_config_chunk([item], Loader, cache)
+        return
+
+    if chunksize is None:
+        chunksize = max(1, min(64, len(indexed) // (workers * 4)))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        futures = [executor.submit(_load_config_chunk, chunk, Loader, cache) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def iter_load_configs(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+    Loader=NXCLCLoader,
+    cache: Union[bool, str] = False,
+    chunksize: Optional[int] = None,
+) -> Iterator[Tuple[PathLike, Union[ConfigDict, Exception]]]:
+    """
+    Load configs in a pool of ``workers`` processes (default: number of CPUs), and yield
+    ``(path, config)`` pairs as they finish, in any order. If a file cannot be loaded, its exception
+    is yielded in place of the config. Files are sent to the workers in chunks of ``chunksize``.
+    """
+
+    paths = list(paths)
+    for index, config, error in _iter_load_results(paths, workers, Loader, cache, chunksize):
+        yield paths[index], config if error is None else error
+
+
+def load_configs(
+    paths: Iterable[PathLike],
+    workers: Optional[int] = None,
+    Loader=NXCLCLoader,
+    cache: Union[bool, str] = False,
+    errors: str = "raise",
+    chunksize: Optional[int] = None,
+) -> List[Union[ConfigDict, Exception]]:
+    """
+    Load configs in a pool of ``workers`` processes (default: number of CPUs), in the order of
+    ``paths``. With ``errors="raise"``, the first error (in order) is raised after all files are
+    loaded, and with ``errors="return"``, exceptions are returned in place of configs.
+    """
+
+    if errors not in ("raise", "return"):
+        raise ValueError(f"Invalid errors mode '{errors}'")
+
+    paths = list(paths)
+    configs = [None] * len(paths)
+    failed = []
+
+    for index, config, error in _iter_load_results(paths, workers, Loader, cache, chunksize):
+        configs[index] = config if error is None else error
+        if error is not None:
+            failed.append(index)
+
+    if failed and errors == "raise":
+        index = min(failed)
+        raise RuntimeError(
+            f"Failed to load {len(failed)} config(s), e.g. {paths[index]}"
+        ) from configs[index]
+
+    return configs
+
+
+def save_config(
+    config: ConfigDict,
+    file: PathLike,
+    Dumper=NXCLCDumper,
+    incremental: bool = False,
+    format: Optional[str] = None,
+    atomic: bool = False,
+    fsync: bool = False,
+    **yaml_kwargs,
+):
+    """
+    Save config to file. The default dumper is backed by libyaml if it is available.
+    With ``Dumper=NXCLCStreamDumper``, the config is written to the file as it is traversed, so it
+    is never represented as a whole, but objects shared between keys are not dumped as anchors and
+    aliases.
+
+    The ``format`` is chosen by the extension of the path if not given, as in ``load_config``.
+    For other formats than YAML, the ``yaml_kwargs`` which the backend supports (its ``options``) are
+    passed to it, and ``Dumper`` is used for values that need YAML tags.
+
+    If ``incremental``, the YAML fragments of unchanged subtrees are reused from the previous save,
+    and the write is skipped if the config did not change since it was last saved to the same file.
+    Only the digests of the last ``SAVED_CACHE_SIZE`` saves are kept (see ``clear_config_cache``).
+    Subtrees with mutable leaves (e.g. lists), which can be changed in place, are dumped again on
+    every save. Shared objects are not dumped as anchors and aliases in this mode, and the file is
+    assumed not to be modified by others. Unsupported ``yaml_kwargs`` fall back to a full dump.
+
+    If ``atomic``, the config is serialized in memory and compared with the existing file, which is
+    left untouched if it has the same content. Otherwise, a temporary file is written next to it and
+    renamed over it, so readers never see a partially written file. Atomic saves are UTF-8 encoded.
+    If ``fsync``, the data (and, for atomic saves, the rename) is flushed to disk before returning.
+    """
 
     path = Path(file).expanduser()
 
-    with path.open("w") as f:
-        yaml.dump(config, f, Dumper=Dumper, **yaml_kwargs)
+    backend = get_backend(format, path)
+    if backend is not None:
+        kwargs = {key: value for key, value in yaml_kwargs.items() if key in backend.options}
+        _write_file(path, backend.dump(config, Dumper, **kwargs), atomic=atomic, fsync=fsync)
+        return
+
+    yaml_kwargs.setdefault("sort_keys", False)
+
+    if incremental:
+        text = _dump_incremental(config, Dumper, yaml_kwargs)
+        if text is not None:
+            key = str(path.resolve())
+            digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+            last_config, last_digest = _LAST_SAVED.get(key, (None, None))
+            if last_digest == digest and last_config() is config and path.exists():
+                _LAST_SAVED.move_to_end(key)
+                return
+
+            _write_file(path, text, atomic=atomic, fsync=fsync)
+            _LAST_SAVED[key] = (weakref.ref(config), digest)
+            _LAST_SAVED.move_to_end(key)
+            while len(_LAST_SAVED) > SAVED_CACHE_SIZE:
+                _LAST_SAVED.popitem(last=False)
+            return
+
+    if atomic:
+        _write_file(path, yaml.dump(config, Dumper=Dumper, **yaml_kwargs), atomic=True, fsync=fsync)
+    else:
+        with path.open("w") as f:
+            yaml.dump(config, f, Dumper=Dumper, **yaml_kwargs)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
@@ -1,10 +1,15 @@
+import os
+import importlib
+from os import PathLike
 from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 from yaml.reader import Reader
 from yaml.scanner import Scanner
 from yaml.parser import Parser
-from yaml.composer import Composer
+from yaml.composer import Composer, ComposerError
 from yaml.constructor import (
     BaseConstructor,
     SafeConstructor,
@@ -20,12 +25,28 @@ from yaml.representer import (
     SafeRepresenter,
     Representer,
 )
+from yaml.events import (
+    AliasEvent,
+    DocumentStartEvent,
+    DocumentEndEvent,
+    MappingStartEvent,
+    MappingEndEvent,
+    ScalarEvent,
+)
+from yaml.nodes import ScalarNode, MappingNode
 from yaml.resolver import Resolver
 
-from .base import ConfigDict
+try:
+    from yaml.cyaml import CParser, CEmitter
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    LIBYAML_AVAILABLE = False
+
+from .base import ConfigDict, FrozenConfigDict
 
 
 __all__ = [
+    "NXCLComposer",
     "NXCLSafeConstructor",
     "NXCLFullConstructor",
     "NXCLConstructor",
@@ -36,16 +57,43 @@ __all__ = [
     "NXCLRepresenter",
     "NXCLSafeDumper",
     "NXCLDumper",
+    "NXCLCSafeLoader",
+    "NXCLCFullLoader",
+    "NXCLCLoader",
+    "NXCLCSafeDumper",
+    "NXCLCDumper",
+    "NXCLSafeStreamDumper",
+    "NXCLStreamDumper",
+    "NXCLCSafeStreamDumper",
+    "NXCLCStreamDumper",
+    "LIBYAML_AVAILABLE",
     "add_constructor",
     "add_multi_constructor",
     "add_representer",
     "add_multi_representer",
+    "warm_imports",
+    "allow_imports",
+    "clear_import_cache",
+    "add_path_alias",
+    "remove_path_alias",
+    "add_search_path",
+    "remove_search_path",
+    "resolve_include_path",
+    "clear_path_cache",
 ]
 
 
-_TEMP_PATHS = {
+_PATH_ALIASES: Dict[str, str] = {
     "@": "./configs/",
 }
+_ALIAS_ORDER: List[str] = ["@"]
+_SEARCH_PATHS: List[Path] = []
+_SEARCH_INDEX: Optional[Dict[str, Path]] = None
+
+# Resolved include paths, with the path that would shadow a path found in the search paths,
+# evicting the least recently used ones.
+PATH_CACHE_SIZE = 1024
+_RESOLVED_PATHS: "OrderedDict[Tuple[str, str], Tuple[Path, Optional[Path]]]" = OrderedDict()
 
 YAML_TAG_MAP = "tag:yaml.org,2002:map"
 YAML_TAG_INCLUDE = u"!include"
@@ -55,36 +103,108 @@ YAML_TAG_PYTHON_OBJECT_NEW_ALIAS = u"!object/new:"
 YAML_TAG_PYTHON_OBJECT_APPLY_ALIAS = u"!object/apply:"
 
 
+class NXCLComposer(Composer):
+    """
+    Composer that replaces ``!include`` nodes with the root node of the included document.
+
+    Includes are composed by the same kind of loader and can refer to the anchors of the including
+    document. Anchors defined in an included document are local to it, and may shadow those of the
+    including document. Each file is composed once per load, and include cycles are detected.
+    """
+
+    # If set to a list, the path of every included file is appended, including nested includes.
+    included_paths = None
+
+    def __init__(self, stream=None):
+        Composer.__init__(self)
+        name = getattr(stream, "name", None)
+        is_path = isinstance(name, str) and name[:1] != "<"
+        self.include_stack = [Path(name).resolve()] if is_path else []
+        self.include_cache = {}
+        self.included_nodes = set()
+        self.inherited_anchors = set()
+
+    def compose_node(self, parent, index):
+        if self.inherited_anchors and not self.check_event(AliasEvent):
+            anchor = self.peek_event().anchor
+            if anchor in self.inherited_anchors:
+                self.inherited_anchors.discard(anchor)
+                del self.anchors[anchor]
+        node = super().compose_node(parent, index)
+        if node.tag == YAML_TAG_INCLUDE:
+            node = self.compose_include(node)
+        return node
+
+    def compose_include(self, node):
+        if not isinstance(node, yaml.ScalarNode):
+            raise ComposerError(None, None, "value of include must be a string", node.start_mark)
+
+        path = resolve_include_path(str(node.value))
+        if path in self.include_stack:
+            cycle = self.include_stack[self.include_stack.index(path):] + [path]
+            raise ComposerError(
+                None, None, "include cycle: " + " -> ".join(map(str, cycle)), node.start_mark,
+            )
+
+        if path not in self.include_cache:
+            if self.included_paths is not None:
+                self.included_paths.append(path)
+
+            self.include_stack.append(path)
+            try:
+                with path.open("r") as f:
+                    loader = self.__class__(f)
+                    loader.anchors = dict(self.anchors)
+                    loader.inherited_anchors = set(self.anchors)
+                    loader.include_stack = self.include_stack
+                    loader.include_cache = self.include_cache
+                    loader.included_nodes = self.included_nodes
+                    loader.included_paths = self.included_paths
+                    try:
+                        included = loader.get_single_node()
+                    finally:
+                        loader.dispose()
+            finally:
+                self.include_stack.pop()
+
+            if included is None:
+                included = yaml.ScalarNode(
+                    "tag:yaml.org,2002:null", "", node.start_mark, node.end_mark,
+                )
+            self.include_cache[path] = included
+            self.included_nodes.add(included)
+
+        return self.include_cache[path]
+
+
 class NXCLConstructorMixin(BaseConstructor):
+    # If set to a list, every constructed ConfigDict is appended once it is filled. Mappings are
+    # filled in the order they are created, so parents always come before their children.
+    constructed_configs = None
+
+    # Root nodes of included documents, which are set by NXCLComposer.
+    included_nodes = frozenset()
+
     def construct_yaml_map(self, node):
         data = ConfigDict()
         yield data
         value = self.construct_mapping(node)
         data.update(value)
-
-    # TODO: As a prototype, the implementation just loads the include file using the default loader.
-    #       But this approach does not support yaml operations (i.e. anchors, references, etc.) in
-    #       the include file. In the future, we need to implement a custom constructor to support
-    #       load the include yaml file as a node. Check below:
-    #           - https://realpython.com/python-yaml/#parse-a-stream-of-events
-    #           - https://pyyaml.org/wiki/PyYAMLDocumentation
-    #           - https://pyyaml.docsforge.com
-    #       Further, we need to support custom path aliases when NXCL supports global config storage.
-    def construct_yaml_include(self, node):
-        if not isinstance(node, yaml.ScalarNode):
-            raise ConstructorError("value of include must be a string")
-
-        path = str(node.value)
-        for symbol, value in _TEMP_PATHS.items():
-            path = path.replace(symbol, value)
-        path = Path(path).expanduser()
-
-        if not path.exists():
-            raise FileNotFoundError(f"include file not found: {path}")
-
-        with path.open("r") as f:
-            return yaml.load(f, Loader=self.__class__)
-            # return yaml.compose(f, Loader=self.__class__)
+        if self.constructed_configs is not None:
+            self.constructed_configs.append(data)
+
+    def construct_object(self, node, deep=False):
+        # The node of an included document is shared by every include of the same file, but each
+        # include is constructed into new objects, so that they do not share mutable values.
+        if node in self.included_nodes:
+            if node in self.constructed_objects:
+                constructed_objects = self.constructed_objects
+                self.constructed_objects = {}
+                try:
+                    return super().construct_object(node, deep=True)
+                finally:
+                    self.constructed_objects = constructed_objects
+        return super().construct_object(node, deep=deep)
 
     # def construct_yaml_multi_map(self, tag_suffix, node):
     #     print(node.tag, tag_suffix)
@@ -94,51 +214,110 @@ class NXCLConstructorMixin(BaseConstructor):
     #     data.update(value)
 
 
+class NXCLImportCacheMixin:
+    """
+    Constructor mixin that memoizes the objects of ``!name:`` and ``!object:`` tags per loader
+    class, so each name is only resolved once. If ``allowed_imports`` is set, only those names can
+    be constructed.
+    """
+
+    resolved_imports = {}
+    allowed_imports = None
+
+    @classmethod
+    def get_resolved_imports(cls) -> dict:
+        # Each loader class has its own cache, as loaders resolve names with different rules.
+        if "resolved_imports" not in cls.__dict__:
+            cls.resolved_imports = {}
+        return cls.resolved_imports
+
+    def find_python_name(self, name, mark, unsafe=False):
+        if self.allowed_imports is not None and name not in self.allowed_imports:
+            raise ConstructorError(
+                "while constructing a Python object", mark,
+                f"{name!r} is not an allowed import", mark,
+            )
+
+        resolved_imports = self.__class__.__dict__.get("resolved_imports")
+        if resolved_imports is not None and name in resolved_imports:
+            return resolved_imports[name]
+
+        if unsafe:
+            value = super().find_python_name(name, mark, unsafe=True)
+        else:
+            value = super().find_python_name(name, mark)
+        self.get_resolved_imports()[name] = value
+        return value
+
+
 class NXCLSafeConstructor(SafeConstructor, NXCLConstructorMixin):
     pass
 
 
-class NXCLFullConstructor(FullConstructor, NXCLConstructorMixin):
+class NXCLFullConstructor(NXCLImportCacheMixin, FullConstructor, NXCLConstructorMixin):
     pass
 
 
-class NXCLConstructor(Constructor, NXCLConstructorMixin):
+class NXCLConstructor(NXCLImportCacheMixin, Constructor, NXCLConstructorMixin):
     pass
 
 
-class NXCLSafeLoader(Reader, Scanner, Parser, Composer, NXCLSafeConstructor, Resolver):
+class NXCLSafeLoader(Reader, Scanner, Parser, NXCLComposer, NXCLSafeConstructor, Resolver):
     def __init__(self, stream):
         Reader.__init__(self, stream)
         Scanner.__init__(self)
         Parser.__init__(self)
-        Composer.__init__(self)
+        NXCLComposer.__init__(self, stream)
         NXCLSafeConstructor.__init__(self)
         Resolver.__init__(self)
 
 
-class NXCLFullLoader(Reader, Scanner, Parser, Composer, NXCLFullConstructor, Resolver):
+class NXCLFullLoader(Reader, Scanner, Parser, NXCLComposer, NXCLFullConstructor, Resolver):
     def __init__(self, stream):
         Reader.__init__(self, stream)
         Scanner.__init__(self)
         Parser.__init__(self)
-        Composer.__init__(self)
+        NXCLComposer.__init__(self, stream)
         NXCLFullConstructor.__init__(self)
         Resolver.__init__(self)
 
 
-class NXCLLoader(Reader, Scanner, Parser, Composer, NXCLConstructor, Resolver):
+class NXCLLoader(Reader, Scanner, Parser, NXCLComposer, NXCLConstructor, Resolver):
     def __init__(self, stream):
         Reader.__init__(self, stream)
         Scanner.__init__(self)
         Parser.__init__(self)
-        Composer.__init__(self)
+        NXCLComposer.__init__(self, stream)
         NXCLConstructor.__init__(self)
         Resolver.__init__(self)
 
 
 class NXCLRepresenterMixin(BaseRepresenter):
     def represent_config(self, data):
-        return self.represent_mapping(YAML_TAG_MAP, data.to_dict())
+        # Nodes are built from the items of the config in a single pass, without copying the tree
+        # with ``to_dict`` first. Like the dicts of ``to_dict``, configs are never aliased.
+        value = []
+        node = MappingNode(YAML_TAG_MAP, value)
+        best_style = True
+
+        items = dict.items(data)
+        if self.sort_keys:
+            try:
+                items = sorted(items)
+            except TypeError:
+                pass
+
+        for item_key, item_value in items:
+            node_key = self.represent_data(item_key)
+            node_value = self.represent_data(item_value)
+            if not (node_key.__class__ is ScalarNode and not node_key.style):
+                best_style = False
+            if not (node_value.__class__ is ScalarNode and not node_value.style):
+                best_style = False
+            value.append((node_key, node_value))
+
+        node.flow_style = best_style if self.default_flow_style is None else self.default_flow_style
+        return node
 
     def represent_module(self, data):
         # TODO: Implement this
@@ -196,6 +375,241 @@ class NXCLDumper(Emitter, Serializer, NXCLRepresenter, Resolver):
         Resolver.__init__(self)
 
 
+class NXCLStreamingMixin(Serializer):
+    """
+    Dumper mixin that emits the events of configs while traversing them, so the document is
+    written as it is dumped and is never represented as a whole. Only the leaf values are
+    represented as nodes, one at a time, so objects are only dumped as anchors and aliases within
+    a leaf, and block style is used for configs unless ``default_flow_style`` is ``False``.
+    """
+
+    def init_streaming(self, explicit_start=None, explicit_end=None, version=None, tags=None):
+        # The serializer state is kept here, as the libyaml emitter keeps its own.
+        self.stream_options = (explicit_start, explicit_end, version, tags)
+        self.serialized_nodes = {}
+        self.anchors = {}
+        self.last_anchor_id = 0
+
+    def represent(self, data):
+        if not isinstance(data, ConfigDict):
+            return super().represent(data)
+
+        explicit_start, explicit_end, version, tags = self.stream_options
+        self.emit(DocumentStartEvent(explicit=explicit_start, version=version, tags=tags))
+        self.stream_config(data)
+        self.emit(DocumentEndEvent(explicit=explicit_end))
+        self.last_anchor_id = 0
+
+    def stream_config(self, config: ConfigDict):
+        if self.default_flow_style is not False:
+            return self.stream_value(config)
+
+        self.emit(MappingStartEvent(None, YAML_TAG_MAP, True, flow_style=False))
+
+        items = dict.items(config)
+        if self.sort_keys:
+            try:
+                items = sorted(items)
+            except TypeError:
+                pass
+
+        for key, value in items:
+            self.stream_value(key)
+            if isinstance(value, ConfigDict):
+                self.stream_config(value)
+            else:
+                self.stream_value(value)
+
+        self.emit(MappingEndEvent())
+
+    def stream_value(self, value):
+        node = self.represent_data(value)
+
+        # Scalars cannot have aliases, so they skip the anchors of the serializer.
+        if node.__class__ is ScalarNode:
+            implicit = (
+                node.tag == self.resolve(ScalarNode, node.value, (True, False)),
+                node.tag == self.resolve(ScalarNode, node.value, (False, True)),
+            )
+            self.emit(ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+        else:
+            self.anchor_node(node)
+            self.serialize_node(node, None, None)
+            self.serialized_nodes = {}
+            self.anchors = {}
+
+        if self.object_keeper:
+            self.represented_objects = {}
+            self.object_keeper = []
+        self.alias_key = None
+
+
+class NXCLSafeStreamDumper(Emitter, NXCLStreamingMixin, NXCLSafeRepresenter, Resolver):
+    def __init__(
+        self, stream, default_style=None, default_flow_style=False, canonical=None,
+        indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+        explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+    ):
+        Emitter.__init__(
+            self, stream, canonical=canonical, indent=indent, width=width,
+            allow_unicode=allow_unicode, line_break=line_break,
+        )
+        Serializer.__init__(
+            self, encoding=encoding, explicit_start=explicit_start,
+            explicit_end=explicit_end, version=version, tags=tags,
+        )
+        self.init_streaming(explicit_start, explicit_end, version, tags)
+        NXCLSafeRepresenter.__init__(
+            self, default_style=default_style, default_flow_style=default_flow_style,
+            sort_keys=sort_keys,
+        )
+        Resolver.__init__(self)
+
+
+class NXCLStreamDumper(Emitter, NXCLStreamingMixin, NXCLRepresenter, Resolver):
+    def __init__(
+        self, stream, default_style=None, default_flow_style=False, canonical=None,
+        indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+        explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+    ):
+        Emitter.__init__(
+            self, stream, canonical=canonical, indent=indent, width=width,
+            allow_unicode=allow_unicode, line_break=line_break,
+        )
+        Serializer.__init__(
+            self, encoding=encoding, explicit_start=explicit_start,
+            explicit_end=explicit_end, version=version, tags=tags,
+        )
+        self.init_streaming(explicit_start, explicit_end, version, tags)
+        NXCLRepresenter.__init__(
+            self, default_style=default_style, default_flow_style=default_flow_style,
+            sort_keys=sort_keys,
+        )
+        Resolver.__init__(self)
+
+
+# libyaml-backed variants, which only replace the parser and the emitter, so tags behave the same.
+# Documents are still composed by NXCLComposer, from the events of libyaml, to resolve includes.
+# They are aliases of the pure Python classes if libyaml is not available.
+
+if LIBYAML_AVAILABLE:
+    class NXCLCSafeLoader(NXCLComposer, CParser, NXCLSafeConstructor, Resolver):
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            NXCLComposer.__init__(self, stream)
+            NXCLSafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+
+    class NXCLCFullLoader(NXCLComposer, CParser, NXCLFullConstructor, Resolver):
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            NXCLComposer.__init__(self, stream)
+            NXCLFullConstructor.__init__(self)
+            Resolver.__init__(self)
+
+
+    class NXCLCLoader(NXCLComposer, CParser, NXCLConstructor, Resolver):
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            NXCLComposer.__init__(self, stream)
+            NXCLConstructor.__init__(self)
+            Resolver.__init__(self)
+
+
+    class NXCLCSafeDumper(CEmitter, NXCLSafeRepresenter, Resolver):
+        def __init__(
+            self, stream, default_style=None, default_flow_style=False, canonical=None,
+            indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+            explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+        ):
+            CEmitter.__init__(
+                self, stream, canonical=canonical, indent=indent, width=width, encoding=encoding,
+                allow_unicode=allow_unicode, line_break=line_break, explicit_start=explicit_start,
+                explicit_end=explicit_end, version=version, tags=tags,
+            )
+            NXCLSafeRepresenter.__init__(
+                self, default_style=default_style, default_flow_style=default_flow_style,
+                sort_keys=sort_keys,
+            )
+            Resolver.__init__(self)
+
+
+    class NXCLCDumper(CEmitter, NXCLRepresenter, Resolver):
+        def __init__(
+            self, stream, default_style=None, default_flow_style=False, canonical=None,
+            indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+            explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+        ):
+            CEmitter.__init__(
+                self, stream, canonical=canonical, indent=indent, width=width, encoding=encoding,
+                allow_unicode=allow_unicode, line_break=line_break, explicit_start=explicit_start,
+                explicit_end=explicit_end, version=version, tags=tags,
+            )
+            NXCLRepresenter.__init__(
+                self, default_style=default_style, default_flow_style=default_flow_style,
+                sort_keys=sort_keys,
+            )
+            Resolver.__init__(self)
+
+
+    # The stream, document and node methods of the serializer are replaced by the libyaml emitter.
+    class NXCLCSafeStreamDumper(CEmitter, NXCLStreamingMixin, NXCLSafeRepresenter, Resolver):
+        def __init__(
+            self, stream, default_style=None, default_flow_style=False, canonical=None,
+            indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+            explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+        ):
+            CEmitter.__init__(
+                self, stream, canonical=canonical, indent=indent, width=width, encoding=encoding,
+                allow_unicode=allow_unicode, line_break=line_break, explicit_start=explicit_start,
+                explicit_end=explicit_end, version=version, tags=tags,
+            )
+            self.init_streaming(explicit_start, explicit_end, version, tags)
+            NXCLSafeRepresenter.__init__(
+                self, default_style=default_style, default_flow_style=default_flow_style,
+                sort_keys=sort_keys,
+            )
+            Resolver.__init__(self)
+
+
+    class NXCLCStreamDumper(CEmitter, NXCLStreamingMixin, NXCLRepresenter, Resolver):
+        def __init__(
+            self, stream, default_style=None, default_flow_style=False, canonical=None,
+            indent=None, width=None, allow_unicode=None, line_break=None, encoding=None,
+            explicit_start=None, explicit_end=None, version=None, tags=None, sort_keys=True,
+        ):
+            CEmitter.__init__(
+                self, stream, canonical=canonical, indent=indent, width=width, encoding=encoding,
+                allow_unicode=allow_unicode, line_break=line_break, explicit_start=explicit_start,
+                explicit_end=explicit_end, version=version, tags=tags,
+            )
+            self.init_streaming(explicit_start, explicit_end, version, tags)
+            NXCLRepresenter.__init__(
+                self, default_style=default_style, default_flow_style=default_flow_style,
+                sort_keys=sort_keys,
+            )
+            Resolver.__init__(self)
+
+else:
+    NXCLCSafeLoader = NXCLSafeLoader
+    NXCLCFullLoader = NXCLFullLoader
+    NXCLCLoader = NXCLLoader
+    NXCLCSafeDumper = NXCLSafeDumper
+    NXCLCDumper = NXCLDumper
+    NXCLCSafeStreamDumper = NXCLSafeStreamDumper
+    NXCLCStreamDumper = NXCLStreamDumper
+
+
+_LOADERS = list(dict.fromkeys([
+    NXCLSafeLoader, NXCLFullLoader, NXCLLoader, NXCLCSafeLoader, NXCLCFullLoader, NXCLCLoader,
+]))
+_DUMPERS = list(dict.fromkeys([
+    NXCLSafeDumper, NXCLDumper, NXCLCSafeDumper, NXCLCDumper,
+    NXCLSafeStreamDumper, NXCLStreamDumper, NXCLCSafeStreamDumper, NXCLCStreamDumper,
+]))
+
+
 def add_constructor(tag, constructor, Loader=None):
     """
     Add a constructor for the given tag.
@@ -203,9 +617,8 @@ def add_constructor(tag, constructor, Loader=None):
     and a node object and produces the corresponding Python object.
     """
     if Loader is None:
-        NXCLSafeLoader.add_constructor(tag, constructor)
-        NXCLFullLoader.add_constructor(tag, constructor)
-        NXCLLoader.add_constructor(tag, constructor)
+        for Loader in _LOADERS:
+            Loader.add_constructor(tag, constructor)
     else:
         Loader.add_constructor(tag, constructor)
 
@@ -218,13 +631,192 @@ def add_multi_constructor(tag_prefix, multi_constructor, Loader=None):
     and a node object and produces the corresponding Python object.
     """
     if Loader is None:
-        NXCLSafeLoader.add_multi_constructor(tag_prefix, multi_constructor)
-        NXCLFullLoader.add_multi_constructor(tag_prefix, multi_constructor)
-        NXCLLoader.add_multi_constructor(tag_prefix, multi_constructor)
+        for Loader in _LOADERS:
+            Loader.add_multi_constructor(tag_prefix, multi_constructor)
     else:
         Loader.add_multi_constructor(tag_prefix, multi_constructor)
 
 
+def _get_search_index() -> Dict[str, Path]:
+    # Relative path of every file under the search paths, which is built once by walking the roots.
+    # Earlier search paths take precedence.
+    global _SEARCH_INDEX
+    if _SEARCH_INDEX is None:
+        index = {}
+        for root in _SEARCH_PATHS:
+            for dirpath, _, filenames in os.walk(root):
+                relpath = os.path.relpath(dirpath, root)
+                for filename in filenames:
+                    key = filename if relpath == "." else f"{relpath}/{filename}"
+                    key = key.replace(os.sep, "/")
+                    index.setdefault(key, Path(dirpath, filename))
+        _SEARCH_INDEX = index
+    return _SEARCH_INDEX
+
+
+def _match_alias(value: str, alias: str) -> bool:
+    # Aliases that end with a name only match whole path components, e.g. "@shared" does not
+    # match "@shared_x.yaml", while other aliases, e.g. "@", match any prefix.
+    if not value.startswith(alias):
+        return False
+    elif alias[-1:].isalnum() or alias[-1:] == "_":
+        return value[len(alias):len(alias) + 1] in ("", "/", os.sep)
+    else:
+        return True
+
+
+def _find_include_path(value: str) -> Tuple[Path, Optional[Path]]:
+    for alias in _ALIAS_ORDER:
+        if _match_alias(value, alias):
+            path = Path(_PATH_ALIASES[alias] + value[len(alias):]).expanduser()
+            break
+    else:
+        path = Path(value).expanduser()
+        if _SEARCH_PATHS and not path.is_absolute() and not path.exists():
+            found = _get_search_index().get(os.path.normpath(path).replace(os.sep, "/"))
+            if found is not None:
+                return found.resolve(), path
+
+    if not path.exists():
+        raise FileNotFoundError(f"include file not found: {path}")
+    return path.resolve(), None
+
+
+def resolve_include_path(value: str) -> Path:
+    """
+    Resolve the path of an ``!include``. The longest path alias at the start of the path is
+    replaced, and relative paths are looked up from the working directory, and then in the search
+    paths. Resolved paths are memoized (up to ``PATH_CACHE_SIZE``), and a memoized path is resolved
+    again if its file was removed, or if a file that takes precedence over it was created.
+    """
+    key = (value, os.getcwd())
+    entry = _RESOLVED_PATHS.get(key)
+    if entry is not None:
+        path, shadow = entry
+        if path.exists() and (shadow is None or not shadow.exists()):
+            _RESOLVED_PATHS.move_to_end(key)
+            return path
+
+    path, shadow = _find_include_path(value)
+    _RESOLVED_PATHS[key] = (path, shadow)
+    _RESOLVED_PATHS.move_to_end(key)
+    while len(_RESOLVED_PATHS) > PATH_CACHE_SIZE:
+        _RESOLVED_PATHS.popitem(last=False)
+    return path
+
+
+def _get_path_registry_key() -> tuple:
+    # State of the path aliases and search paths, which decides how include paths are resolved.
+    return tuple(sorted(_PATH_ALIASES.items())), tuple(str(path) for path in _SEARCH_PATHS)
+
+
+def add_path_alias(alias: str, path: PathLike):
+    """
+    Add an alias, e.g. ``@shared``, which is replaced by ``path`` at the start of include paths.
+    An alias that ends with a letter, digit or underscore only matches whole path components, e.g.
+    ``@shared/model.yaml``, and other aliases, e.g. ``@``, match any prefix.
+    """
+    _PATH_ALIASES[alias] = os.fspath(path)
+    _ALIAS_ORDER[:] = sorted(_PATH_ALIASES, key=len, reverse=True)
+    _RESOLVED_PATHS.clear()
+
+
+def remove_path_alias(alias: str):
+    del _PATH_ALIASES[alias]
+    _ALIAS_ORDER.remove(alias)
+    _RESOLVED_PATHS.clear()
+
+
+def add_search_path(path: PathLike):
+    """
+    Add a root directory, in which relative include paths are looked up if they are not found
+    from the working directory. The files under the roots are indexed once, on the first lookup.
+    """
+    path = Path(path).expanduser().resolve()
+    if path not in _SEARCH_PATHS:
+        _SEARCH_PATHS.append(path)
+        clear_path_cache()
+
+
+def remove_search_path(path: PathLike):
+    _SEARCH_PATHS.remove(Path(path).expanduser().resolve())
+    clear_path_cache()
+
+
+def clear_path_cache():
+    """
+    Clear the memoized include paths and the index of the search paths, e.g. after files are
+    added to or removed from the search paths.
+    """
+    global _SEARCH_INDEX
+    _SEARCH_INDEX = None
+    _RESOLVED_PATHS.clear()
+
+
+def _import_loaders(Loader=None):
+    if Loader is None:
+        return [Loader for Loader in _LOADERS if issubclass(Loader, NXCLImportCacheMixin)]
+    elif not issubclass(Loader, NXCLImportCacheMixin):
+        raise TypeError(f"{Loader.__name__} does not construct Python objects")
+    return [Loader]
+
+
+def _import_name(name: str) -> Any:
+    module_name, _, object_name = name.rpartition(".")
+    module = importlib.import_module(module_name or "builtins")
+    try:
+        return getattr(module, object_name)
+    except AttributeError:
+        raise ImportError(
+            f"cannot find {object_name!r} in the module {module.__name__!r}"
+        ) from None
+
+
+def warm_imports(names: Iterable[Any], Loader=None):
+    """
+    Resolve the names of ``!name:`` and ``!object:`` tags in advance, importing their modules.
+    Objects can be given instead of names, and are cached by their dotted name.
+    Names are cached for the given loader class, or for every NXCL loader.
+    """
+    loaders = _import_loaders(Loader)
+    resolved = {}
+    for name in names:
+        if isinstance(name, str):
+            resolved[name] = _import_name(name)
+        else:
+            resolved[f"{name.__module__}.{name.__qualname__}"] = name
+
+    for Loader in loaders:
+        Loader.get_resolved_imports().update(resolved)
+
+
+def allow_imports(names: Iterable[Any], Loader=None):
+    """
+    Add names (or objects) to the allow-list of ``!name:`` and ``!object:`` tags and resolve them.
+    Once a loader class has an allow-list, other names are rejected.
+    """
+    names = list(names)
+    warm_imports(names, Loader=Loader)
+    allowed = {
+        name if isinstance(name, str) else f"{name.__module__}.{name.__qualname__}"
+        for name in names
+    }
+
+    for Loader in _import_loaders(Loader):
+        if "allowed_imports" not in Loader.__dict__ or Loader.allowed_imports is None:
+            Loader.allowed_imports = set()
+        Loader.allowed_imports.update(allowed)
+
+
+def clear_import_cache(Loader=None):
+    """
+    Clear the resolved names and the allow-list of the given loader class, or of every NXCL loader.
+    """
+    for Loader in _import_loaders(Loader):
+        Loader.resolved_imports = {}
+        Loader.allowed_imports = None
+
+
 def add_representer(data_type, representer, Dumper=None):
     """
     Add a representer for the given type.
@@ -233,8 +825,8 @@ def add_representer(data_type, representer, Dumper=None):
     and producing the corresponding representation node.
     """
     if Dumper is None:
-        NXCLSafeDumper.add_representer(data_type, representer)
-        NXCLDumper.add_representer(data_type, representer)
+        for Dumper in _DUMPERS:
+            Dumper.add_representer(data_type, representer)
     else:
         Dumper.add_representer(data_type, representer)
 
@@ -247,8 +839,8 @@ def add_multi_representer(data_type, multi_representer, Dumper=None):
     and producing the corresponding representation node.
     """
     if Dumper is None:
-        NXCLSafeDumper.add_multi_representer(data_type, multi_representer)
-        NXCLDumper.add_multi_representer(data_type, multi_representer)
+        for Dumper in _DUMPERS:
+            Dumper.add_multi_representer(data_type, multi_representer)
     else:
         Dumper.add_multi_representer(data_type, multi_representer)
 
@@ -267,8 +859,8 @@ NXCLConstructor.add_multi_constructor(YAML_TAG_PYTHON_OBJECT_NEW_ALIAS, Construc
 NXCLConstructor.add_multi_constructor(YAML_TAG_PYTHON_OBJECT_APPLY_ALIAS, Constructor.construct_python_object_apply)
 
 # NXCL extensions
-add_constructor(YAML_TAG_INCLUDE, NXCLConstructorMixin.construct_yaml_include)
 add_constructor(ConfigDict.yaml_tag, NXCLConstructorMixin.construct_yaml_map)
 # add_multi_constructor(ConfigDict.yaml_tag, NXCLConstructorMixin.construct_yaml_multi_map)
 
 add_representer(ConfigDict, NXCLRepresenterMixin.represent_config)
+add_representer(FrozenConfigDict, NXCLRepresenterMixin.represent_config)
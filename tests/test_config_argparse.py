@@ -0,0 +1,149 @@
+from argparse import ArgumentParser
+
+import pytest
+
+from nxcl.config import ConfigDict
+from nxcl.config.argparse import (
+    add_config_arguments,
+    apply_config_arguments,
+    clear_parser_cache,
+    parse_config_arguments,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_parser_cache():
+    clear_parser_cache(disk=False)
+    yield
+    clear_parser_cache(disk=False)
+
+
+def make_parser(config, **kwargs):
+    parser = ArgumentParser()
+    add_config_arguments(parser, config, **kwargs)
+    return parser
+
+
+def make_config():
+    return ConfigDict({
+        "train": {"lr": 0.1, "epochs": 10, "steps": (1, 2), "amp": False, "name": "run"},
+        "seed": 0,
+        "_private": 1,
+    })
+
+
+def test_parse_forms():
+    config = make_config()
+    remaining = parse_config_arguments(config, [
+        "--train.lr=0.5", "--train.epochs", "20", "--train.amp", "yes", "--train.name=-x",
+    ])
+    assert remaining == []
+    assert config["train.lr"] == 0.5 and config["train.epochs"] == 20
+    assert config["train.amp"] is True and config["train.name"] == "-x"
+
+
+def test_parse_negative_numbers_and_sequences():
+    config = make_config()
+    args = ["--seed", "-3", "--train.steps", "-1", "4", "--train.lr", "-.5"]
+    assert parse_config_arguments(config, args) == []
+    assert config["seed"] == -3 and config["train.lr"] == -0.5
+    assert config["train.steps"] == (-1, 4)
+
+
+def test_parse_passes_other_args_through():
+    config = make_config()
+    others = ["--other", "2", "--_private", "3", "--train", "4", "pos", "--", "--seed", "5"]
+    assert parse_config_arguments(config, ["--seed", "1", *others]) == others
+    assert config["seed"] == 1 and config["_private"] == 1
+
+
+def test_parse_prefix_and_aliases():
+    config = make_config()
+    remaining = parse_config_arguments(
+        config, ["-s", "7", "--cfg.train.lr", "1", "--train.lr", "2"], prefix="cfg",
+        aliases={"cfg.seed": ["-s", "--random-seed"]},
+    )
+    assert remaining == ["--train.lr", "2"]
+    assert config["seed"] == 7 and config["train.lr"] == 1.0
+
+
+def test_parse_errors_and_help(capsys):
+    with pytest.raises(SystemExit):
+        parse_config_arguments(make_config(), ["--seed", "x"])
+    assert "argument --seed: invalid int value: 'x'" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        parse_config_arguments(make_config(), ["--seed"])
+    assert "argument --seed: expected one argument" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit) as e:
+        parse_config_arguments(make_config(), ["--seed", "1", "-h"])
+    assert e.value.code == 0
+    assert "--train.lr LR" in capsys.readouterr().out
+
+
+def test_parse_matches_parser():
+    args = ["--train.lr", "0.5", "--train.steps", "3", "--train.amp", "f", "--seed=-2"]
+    config = make_config()
+    assert parse_config_arguments(config, args) == []
+
+    expected = make_config()
+    namespace = make_parser(expected).parse_args(args)
+    for key, value in vars(namespace).items():
+        expected[key] = tuple(value) if isinstance(expected[key], tuple) else value
+    assert config.to_dict() == expected.to_dict()
+
+
+def test_apply_namespace():
+    config = make_config()
+    namespace = make_parser(config, prefix="cfg").parse_args([
+        "--cfg.train.steps", "3", "4", "--cfg.train.amp", "true", "--cfg.seed", "-1",
+    ])
+    namespace.other = 1
+    applied = apply_config_arguments(config, namespace, prefix="cfg")
+    assert sorted(applied) == ["seed", "train.amp", "train.steps"]
+    assert config["train.steps"] == (3, 4) and config["train.amp"] is True
+    assert config["seed"] == -1 and "other" not in config
+
+    # Twice with the same types of leaves.
+    applied = apply_config_arguments(config, {"train.steps": [5], "train.lr": "2"})
+    assert sorted(applied) == ["train.lr", "train.steps"]
+    assert config["train.steps"] == (5,) and config["train.lr"] == 2.0
+
+
+def test_apply_skips_missing_and_private_keys():
+    config = make_config()
+    applied = apply_config_arguments(config, {
+        "train": 1, "missing": 2, "train.missing": 3, "missing.key": 4, "_private": 5, "seed": 6,
+    })
+    assert applied == ["seed"]
+    assert config.to_dict() == {**make_config().to_dict(), "seed": 6}
+
+
+def test_apply_matches_parse():
+    args = ["--train.lr", "0.5", "--train.steps", "3", "--train.name", "x"]
+    config, expected = make_config(), make_config()
+    apply_config_arguments(config, make_parser(config).parse_args(args))
+    parse_config_arguments(expected, args)
+    assert config.to_dict() == expected.to_dict()
+
+
+def test_cached_parser_matches_uncached():
+    config = ConfigDict({"a": {"b": 1, "c": [1.0]}, "d": True, "_e": 0})
+    args = ["--a.b", "2", "--a.c", "1", "2", "--x", "3"]
+    expected = make_parser(config, aliases={"a.b": "-b"}).parse_known_args(args)
+    for _ in range(2):
+        parser = make_parser(config, aliases={"a.b": "-b"}, cache="memory")
+        assert parser.parse_known_args(args) == expected
+        assert parser.format_help() == make_parser(config, aliases={"a.b": "-b"}).format_help()
+
+
+def test_cached_parser_follows_in_place_edits():
+    config = ConfigDict({"a": [1, 2]})
+    make_parser(config, cache="memory")
+    config["a"].append(3)
+    assert "Default: [1, 2, 3]" in make_parser(config, cache="memory").format_help()
+
+    config["a"][:] = ["x"]
+    args = make_parser(config, cache="memory").parse_args(["--a", "y", "z"])
+    assert args.a == ["y", "z"]
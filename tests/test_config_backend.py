@@ -0,0 +1,33 @@
+import importlib.util
+
+import pytest
+
+from nxcl.core.config import NXCLDumper, NXCLLoader, ConfigDict, load_config, save_config
+from nxcl.core.config.backend import get_backend
+
+FORMATS = ["json", "pickle", pytest.param("msgpack", marks=pytest.mark.skipif(
+    importlib.util.find_spec("msgpack") is None, reason="msgpack is not installed",
+))]
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_reserved_keys_round_trip(format):
+    backend = get_backend(format)
+    config = ConfigDict({
+        "__yaml__": "a: 1",
+        "__locked__": False,
+        "\\__locked__": "escaped",
+        "m": {"__yaml__": [1, 2], "x": (1, 2)},
+    })
+    config.m.lock()
+    loaded = backend.load(backend.dump(config, NXCLDumper), NXCLLoader)
+    assert loaded == config
+    assert not loaded.is_locked() and loaded.m.is_locked()
+
+
+@pytest.mark.parametrize("format", ["json", "pickle"])
+def test_yaml_options_are_not_passed_to_backends(tmp_path, format):
+    config = ConfigDict({"b": 1, "a": {"c": [1, 2]}})
+    path = tmp_path / f"config.{'json' if format == 'json' else 'pkl'}"
+    save_config(config, path, default_flow_style=False, width=120, sort_keys=True)
+    assert load_config(path) == config
@@ -0,0 +1,17 @@
+from nxcl.core.config import load_config
+
+
+def test_cache_hits_do_not_share_values(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("r: {list: [1, 2], x: 1}\n")
+    cache_dir = tmp_path / "cache"
+
+    first = load_config(path, cache=True, cache_dir=cache_dir)
+    first["r.list"].append(3)
+    second = load_config(path, cache=True, cache_dir=cache_dir)
+    second["r.list"].append(42)
+    second["r.x"] = 2
+    third = load_config(path, cache="memory")
+    third["r.list"].append(42)
+    assert load_config(path, cache="memory")["r"] == {"list": [1, 2], "x": 1}
+    assert load_config(path, cache=True, cache_dir=cache_dir)["r.list"] == [1, 2]
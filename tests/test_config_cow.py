@@ -0,0 +1,68 @@
+import pickle
+
+import pytest
+
+from nxcl.core.config import ConfigDict
+from nxcl.core.config.backend import get_backend
+
+
+def make_config():
+    return ConfigDict({"m": {"w": 1, "sub": {"x": 2}}, "n": {"y": 3}})
+
+
+def test_original_keeps_referenced_subtree():
+    base = make_config()
+    m = base.m
+    copy = base.copy(copy_on_write=True)
+    base.m
+    m.w = 99
+    assert base["m.w"] == 99
+    assert copy["m.w"] == 1
+
+
+def test_copy_clones_on_write():
+    base = make_config()
+    copy = base.copy(copy_on_write=True)
+    copy["m.sub.x"] = 5
+    assert base["m.sub.x"] == 2
+    assert copy["m.sub.x"] == 5
+    assert dict.__getitem__(base, "n") is dict.__getitem__(copy, "n")
+
+
+def test_original_write_unshares_copy():
+    base = make_config()
+    copy = base.copy(copy_on_write=True)
+    base["m.sub.x"] = 5
+    base.n.y = 6
+    assert copy["m.sub.x"] == 2
+    assert copy["n.y"] == 3
+
+
+def test_referenced_subtree_hands_out_unshared_children():
+    base = make_config()
+    m = base.m
+    copy = base.copy(copy_on_write=True)
+    m.sub.x = 5
+    assert base["m.sub.x"] == 5
+    assert copy["m.sub.x"] == 2
+
+
+def test_lock_copy_does_not_clone():
+    base = make_config()
+    copy = base.copy(copy_on_write=True).lock()
+    assert dict.__getitem__(base, "m") is dict.__getitem__(copy, "m")
+    assert not base.is_locked() and not base.m.sub.is_locked()
+    assert copy.m.sub.is_locked()
+    with pytest.raises(RuntimeError):
+        copy["m.sub.z"] = 1
+    base["m.sub.z"] = 1
+    assert "m.sub.z" not in copy
+
+
+def test_locked_copy_serialization():
+    base = make_config()
+    copy = base.copy(copy_on_write=True).lock()
+    loaded = pickle.loads(pickle.dumps(copy))
+    assert loaded.m.sub.is_locked()
+    loaded = get_backend("json").load(get_backend("json").dump(copy, None), None)
+    assert loaded.m.sub.is_locked()
@@ -0,0 +1,35 @@
+from nxcl.core.config import ConfigDict, diff
+from nxcl.core.config import base
+
+
+def make_config(value=1):
+    return ConfigDict({"a": value, "m": {f"k{i}": {"x": i, "y": "text"} for i in range(10)}})
+
+
+def test_diff_skips_equal_subtrees(monkeypatch):
+    a, b = make_config(), make_config(2)
+    calls, inner = [], base._diff
+
+    def _diff(prefix, *args):
+        calls.append(prefix)
+        return inner(prefix, *args)
+
+    monkeypatch.setattr(base, "_diff", _diff)
+    assert diff(a, b).changed == ["a"]
+    assert calls == [""]
+
+    b["m.k3.y"] = "changed"
+    calls.clear()
+    assert diff(a, b).changed == ["a", "m.k3.y"]
+    assert calls == ["", "m.", "m.k3."]
+
+
+def test_diff_visits_subtrees_with_mutable_leaves():
+    a, b = make_config([1]), make_config([1])
+    b["m.k3.y"] = ["changed"]
+    assert diff(a, b).changed == ["m.k3.y"]
+    b["m.k3.y"].append(1)
+    a["m.k3.y"] = ["changed", 1]
+    assert diff(a, b).changed == []
+    a["m.k3.y"].append(2)
+    assert diff(a, b).changed == ["m.k3.y"]
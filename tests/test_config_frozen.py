@@ -0,0 +1,55 @@
+import pickle
+
+import pytest
+
+from nxcl.core.config import ConfigDict, FrozenConfigDict
+
+
+def make_config():
+    return ConfigDict({"a": 1, "f": FrozenConfigDict({"a": 1, "b": {"c": [2]}})})
+
+
+def test_frozen_child_is_immutable():
+    config = make_config()
+    frozen = config.f
+    digest = hash(frozen)
+    with pytest.raises(RuntimeError):
+        config["f.a"] = 9
+    with pytest.raises(RuntimeError):
+        config["f.b.d"] = 9
+    with pytest.raises(RuntimeError):
+        del config["f.a"]
+    with pytest.raises(RuntimeError):
+        config.merge({"f": {"a": 5}})
+    with pytest.raises(RuntimeError):
+        frozen.merge({"a": 5})
+    assert frozen["a"] == dict.__getitem__(frozen, "a") == 1
+    assert hash(frozen) == digest
+
+
+def test_frozen_rejects_state_changes():
+    frozen = FrozenConfigDict({"a": 1})
+    for method, arg in [("use_index", True), ("use_references", True), ("use_schema", {})]:
+        with pytest.raises(RuntimeError):
+            getattr(frozen, method)(arg)
+
+
+def test_frozen_child_of_copy():
+    config = make_config()
+    copy = config.copy(copy_on_write=True)
+    assert copy.f is config.f
+    copy["a"] = 2
+    assert config["a"] == 1
+    loaded = pickle.loads(pickle.dumps(config.f))
+    assert loaded == config.f and isinstance(loaded, FrozenConfigDict)
+
+
+def test_frozen_bulk_construction_cannot_unlock():
+    assert FrozenConfigDict.from_nested({"a": {"b": 1}})["a.b"] == 1
+    assert FrozenConfigDict.from_flat({"a.b": 1}, lock=True)["a.b"] == 1
+    for build, mapping in [
+        (FrozenConfigDict.from_nested, {"a": {"b": 1}}),
+        (FrozenConfigDict.from_flat, {"a.b": 1}),
+    ]:
+        with pytest.raises(RuntimeError):
+            build(mapping, lock=False)
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+import yaml
+from yaml.constructor import ConstructorError
+
+from nxcl.core.config import NXCLLoader, allow_imports, clear_import_cache, warm_imports
+
+
+@pytest.fixture(autouse=True)
+def clear_imports():
+    clear_import_cache()
+    yield
+    clear_import_cache()
+
+
+def test_allow_list_rejects_other_names():
+    allow_imports(["os.path.join"], Loader=NXCLLoader)
+    assert yaml.load("f: !name:os.path.join", Loader=NXCLLoader).f is os.path.join
+    with pytest.raises(ConstructorError, match="not an allowed import"):
+        yaml.load("f: !name:os.path.exists", Loader=NXCLLoader)
+    with pytest.raises(ConstructorError, match="not an allowed import"):
+        yaml.load("f: !object:os.system ['true']", Loader=NXCLLoader)
+
+    allow_imports([json.dumps], Loader=NXCLLoader)
+    assert yaml.load("f: !name:json.dumps", Loader=NXCLLoader).f is json.dumps
+
+
+def test_failed_lookups_are_not_cached(monkeypatch):
+    document = "f: !name:nxcl_test_module.func"
+    with pytest.raises(ConstructorError):
+        yaml.load(document, Loader=NXCLLoader)
+    assert "nxcl_test_module.func" not in NXCLLoader.get_resolved_imports()
+
+    module = types.ModuleType("nxcl_test_module")
+    module.func = lambda: 1
+    monkeypatch.setitem(sys.modules, "nxcl_test_module", module)
+    assert yaml.load(document, Loader=NXCLLoader).f is module.func
+
+
+def test_clear_import_cache_resets_allow_list():
+    allow_imports(["os.path.join"])
+    warm_imports([json.dumps], Loader=NXCLLoader)
+    assert NXCLLoader.get_resolved_imports()["json.dumps"] is json.dumps
+    with pytest.raises(ConstructorError):
+        yaml.load("f: !name:os.path.exists", Loader=NXCLLoader)
+
+    clear_import_cache()
+    assert NXCLLoader.allowed_imports is None
+    assert NXCLLoader.get_resolved_imports() == {}
+    assert yaml.load("f: !name:os.path.exists", Loader=NXCLLoader).f is os.path.exists
@@ -0,0 +1,45 @@
+import pytest
+
+from nxcl.core.config import NXCLCLoader, NXCLLoader, load_config
+
+LOADERS = [NXCLLoader, NXCLCLoader]
+
+
+@pytest.fixture
+def configs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.yaml").write_text("base: &base {x: 1}\nmodel: *base\n")
+    (tmp_path / "b.yaml").write_text("base: &base {y: 2}\nmodel: *base\n")
+    (tmp_path / "list.yaml").write_text("values: [1, 2]\nnested: {z: 3}\n")
+    (tmp_path / "uses_parent.yaml").write_text("model: *base\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("Loader", LOADERS)
+def test_included_anchors_are_local(configs, Loader):
+    (configs / "main.yaml").write_text("a: !include a.yaml\nb: !include b.yaml\n")
+    config = load_config(configs / "main.yaml", Loader=Loader)
+    assert config["a.model.x"] == 1
+    assert config["b.model.y"] == 2
+
+
+@pytest.mark.parametrize("Loader", LOADERS)
+def test_included_anchors_shadow_parent(configs, Loader):
+    (configs / "main.yaml").write_text(
+        "base: &base {w: 0}\na: !include a.yaml\np: !include uses_parent.yaml\nq: *base\n"
+    )
+    config = load_config(configs / "main.yaml", Loader=Loader)
+    assert config["a.model.x"] == 1
+    assert config["p.model.w"] == 0
+    assert config["q.w"] == 0
+
+
+
+@pytest.mark.parametrize("Loader", LOADERS)
+def test_repeated_includes_are_independent(configs, Loader):
+    (configs / "main.yaml").write_text("a: !include list.yaml\nb: !include list.yaml\n")
+    config = load_config(configs / "main.yaml", Loader=Loader)
+    config["a.values"].append(3)
+    config["a.nested.z"] = 4
+    assert config["b.values"] == [1, 2]
+    assert config["b.nested.z"] == 3
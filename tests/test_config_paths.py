@@ -0,0 +1,67 @@
+import pytest
+
+from nxcl.core.config import (
+    add_path_alias,
+    add_search_path,
+    clear_config_cache,
+    load_config,
+    remove_path_alias,
+    remove_search_path,
+    resolve_include_path,
+)
+from nxcl.core.config import yaml as nxcl_yaml
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "shared_x.yaml").write_text("source: default\n")
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "model.yaml").write_text("source: shared\n")
+    add_path_alias("@shared", tmp_path / "shared")
+    yield tmp_path
+    remove_path_alias("@shared")
+
+
+def test_alias_matches_whole_components(shared):
+    (shared / "main.yaml").write_text(
+        "a: !include '@shared/model.yaml'\nb: !include '@shared_x.yaml'\n"
+    )
+    config = load_config(shared / "main.yaml")
+    assert config["a.source"] == "shared"
+    assert config["b.source"] == "default"
+
+
+def test_load_cache_sees_alias_changes(shared):
+    (shared / "main.yaml").write_text("a: !include '@shared/model.yaml'\n")
+    (shared / "other").mkdir()
+    (shared / "other" / "model.yaml").write_text("source: other\n")
+    clear_config_cache(disk=False)
+    assert load_config(shared / "main.yaml", cache="memory")["a.source"] == "shared"
+    add_path_alias("@shared", shared / "other")
+    assert load_config(shared / "main.yaml", cache="memory")["a.source"] == "other"
+
+
+def test_memoized_paths_are_checked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "root").mkdir()
+    (tmp_path / "root" / "model.yaml").write_text("source: root\n")
+    add_search_path(tmp_path / "root")
+    try:
+        assert resolve_include_path("model.yaml") == tmp_path / "root" / "model.yaml"
+        (tmp_path / "model.yaml").write_text("source: cwd\n")
+        assert resolve_include_path("model.yaml") == tmp_path / "model.yaml"
+        (tmp_path / "model.yaml").unlink()
+        assert resolve_include_path("model.yaml") == tmp_path / "root" / "model.yaml"
+    finally:
+        remove_search_path(tmp_path / "root")
+
+
+def test_memoized_paths_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(nxcl_yaml, "PATH_CACHE_SIZE", 2)
+    for name in "abc":
+        (tmp_path / f"{name}.yaml").write_text("x: 1\n")
+        resolve_include_path(f"{name}.yaml")
+    assert [value for value, _ in nxcl_yaml._RESOLVED_PATHS] == ["b.yaml", "c.yaml"]
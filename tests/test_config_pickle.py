@@ -0,0 +1,29 @@
+import pickle
+
+import pytest
+
+from nxcl.core.config import ConfigDict, FrozenConfigDict
+
+
+def test_pickle_keeps_references():
+    config = ConfigDict({"w": 2, "h": "${w * 2}"}).use_references()
+    loaded = pickle.loads(pickle.dumps(config))
+    assert loaded.uses_references()
+    assert loaded["h"] == 4
+
+
+def test_pickle_keeps_nested_frozen_configs():
+    inner = FrozenConfigDict({"y": [1, 2]})
+    config = ConfigDict({"a": 1, "f": FrozenConfigDict({"x": 1, "g": inner})})
+    loaded = pickle.loads(pickle.dumps(config))
+    assert loaded == config
+    assert type(loaded.f) is FrozenConfigDict and type(loaded["f.g"]) is FrozenConfigDict
+    assert hash(loaded.f) == hash(config.f)
+    with pytest.raises(RuntimeError):
+        loaded["f.x"] = 5
+    with pytest.raises(RuntimeError):
+        loaded["f.g.y"] = 5
+    loaded["a"] = 2
+
+    loaded = pickle.loads(pickle.dumps(config.f))
+    assert type(loaded) is FrozenConfigDict and type(loaded.g) is FrozenConfigDict
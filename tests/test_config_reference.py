@@ -0,0 +1,18 @@
+from nxcl.core.config import ConfigDict
+
+
+def test_reference_to_subtree_sees_new_keys():
+    config = ConfigDict({"m": {"x": 1, "y": 2}, "n": "${len(m)}", "k": "${n * 10}"})
+    config.use_references()
+    assert config["n"] == 2 and config["k"] == 20
+    config["m.z"] = 3
+    assert config["n"] == 3 and config["k"] == 30
+    del config["m.x"]
+    assert config.n == 2
+
+
+def test_reference_to_leaf_is_memoized():
+    config = ConfigDict({"w": 2, "h": "${w * 2}"}).use_references()
+    assert config["h"] == 4
+    config["w"] = 3
+    assert config["h"] == 6
@@ -0,0 +1,61 @@
+import os
+import stat
+
+from nxcl.core.config import ConfigDict, clear_config_cache, load_config, save_config
+from nxcl.core.config import utils
+
+
+def test_incremental_save_sees_in_place_edits(tmp_path):
+    path = tmp_path / "config.yaml"
+    config = ConfigDict({"run": {"tags": ["a"], "seed": 1}, "model": {"width": 2}})
+    save_config(config, path, incremental=True)
+    config["run.tags"].append("b")
+    save_config(config, path, incremental=True)
+    assert load_config(path)["run.tags"] == ["a", "b"]
+    config["model.width"] = 3
+    save_config(config, path, incremental=True)
+    assert load_config(path) == config
+
+
+def test_fingerprint_sees_in_place_edits():
+    config = ConfigDict({"run": {"tags": ["a"]}, "model": {"width": 2}})
+    digest = config.fingerprint()
+    config["run.tags"].append("b")
+    assert config.fingerprint() != digest
+    config["run.tags"].pop()
+    assert config.fingerprint() == digest
+
+
+def test_incremental_save_records_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "SAVED_CACHE_SIZE", 2)
+    config = ConfigDict({"model": {"width": 2}})
+    paths = [tmp_path / f"config{i}.yaml" for i in range(3)]
+    for path in paths:
+        save_config(config, path, incremental=True)
+    assert list(utils._LAST_SAVED) == [str(path.resolve()) for path in paths[1:]]
+
+    paths[2].write_text("changed by others")
+    clear_config_cache(disk=False)
+    assert not utils._LAST_SAVED
+    save_config(config, paths[2], incremental=True)
+    assert load_config(paths[2]) == config
+
+
+def test_atomic_save_keeps_symlinks_and_modes(tmp_path):
+    config = ConfigDict({"model": {"width": 2}})
+    target, link = tmp_path / "target.yaml", tmp_path / "link.yaml"
+    target.write_text("old: 1\n")
+    os.chmod(target, 0o640)
+    link.symlink_to(target)
+    save_config(config, link, atomic=True)
+    assert link.is_symlink() and load_config(target) == config
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+    umask = os.umask(0o027)
+    try:
+        save_config(config, tmp_path / "new.yaml", atomic=True)
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE((tmp_path / "new.yaml").stat().st_mode) == 0o640
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == ["link.yaml", "new.yaml", "target.yaml"]
@@ -0,0 +1,66 @@
+import pickle
+
+import pytest
+
+from nxcl.core.config import ConfigDict, ConfigSchema, ConfigValue
+
+SCHEMA = {"model": {"width": int, "depth": 2}}
+
+
+def test_validate_rejects_value_for_mapping():
+    schema = ConfigSchema(SCHEMA)
+    with pytest.raises(ValueError, match="model: Expected a mapping"):
+        schema.validate(ConfigDict({"model": 5}))
+    config = schema.validate(ConfigDict({"model": {"width": "3"}}))
+    assert config["model"] == {"width": 3, "depth": 2}
+
+
+def test_assignment_rejects_value_for_mapping():
+    config = ConfigDict({"model": {"width": 1}}).use_schema(SCHEMA)
+    with pytest.raises(TypeError, match="model: Expected a mapping"):
+        config["model"] = 5
+    config["model"] = {"width": 4}
+    assert config["model.depth"] == 2
+
+
+def test_pickle_keeps_schema():
+    config = ConfigDict({"model": {"width": 2}}).use_schema({"model": {"width": int}})
+    loaded = pickle.loads(pickle.dumps(config))
+    assert loaded.get_schema() is not None
+    loaded["model.width"] = "3"
+    assert loaded["model.width"] == 3
+    with pytest.raises(KeyError):
+        del loaded["model.width"]
+
+    subtree = pickle.loads(pickle.dumps(config.model))
+    with pytest.raises(TypeError):
+        subtree["width"] = "wide"
+
+
+def test_check_sees_in_place_edits():
+    schema = ConfigSchema({"tags": ConfigValue(type=list, validator=lambda v: len(v) <= 2)})
+    config = ConfigDict({"tags": [1, 2]})
+    assert schema.is_valid(config)
+    config["tags"].append(3)
+    assert schema.check_subtree(config)[0]
+    assert not schema.is_valid(config)
+
+
+def test_defaults_keep_lock_states():
+    schema = ConfigSchema({"model": {"width": 2, "opt": {"lr": 0.1}}, "seed": 0})
+    config = ConfigDict({"model": {"opt": {}}}).lock()
+    config.model.opt.unlock()
+    schema.validate(config)
+    assert config["model.width"] == 2 and config["model.opt.lr"] == 0.1 and config["seed"] == 0
+    assert config.is_locked() and config.model.is_locked()
+    assert not config.model.opt.is_locked()
+    config["model.opt.momentum"] = 0.9
+
+
+def test_defaults_in_locked_copy_on_write_copy():
+    schema = ConfigSchema({"model": {"width": 2}})
+    config = ConfigDict({"model": {}}).lock()
+    copy = config.copy(copy_on_write=True)
+    schema.validate(config)
+    assert config["model.width"] == 2 and "model.width" not in copy
+    assert copy.model.is_locked()
@@ -0,0 +1,95 @@
+import argparse
+import fractions
+import os
+
+import pytest
+import yaml
+
+from nxcl.core.config import (
+    LIBYAML_AVAILABLE,
+    ConfigDict,
+    NXCLCDumper,
+    NXCLCFullLoader,
+    NXCLCLoader,
+    NXCLCSafeDumper,
+    NXCLCSafeLoader,
+    NXCLDumper,
+    NXCLFullLoader,
+    NXCLLoader,
+    NXCLSafeDumper,
+    NXCLSafeLoader,
+)
+
+pytestmark = pytest.mark.skipif(not LIBYAML_AVAILABLE, reason="libyaml is not available")
+
+DOCUMENT = """
+x: !include inc.yaml
+y: !include inc.yaml
+c: !config {p: 1, q: {r: s}}
+anchor: &A {k: 1, l: [1, 2]}
+alias: *A
+merged: {<<: *A, k: 2}
+join: !name:os.path.join
+ns: !object:argparse.Namespace {a: 1}
+frac: !object/apply:fractions.Fraction [1, 3]
+date: 2020-01-01
+"""
+
+
+@pytest.fixture
+def document(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "inc.yaml").write_text("a: 1\nb: [1, 2]\nnested: {c: &B {d: e}, f: *B}\n")
+    return DOCUMENT
+
+
+def make_config():
+    return ConfigDict({
+        f"g{i}": {"a": i, "b": f"text {i}", "c": [i, 1.5, None, True], "d": {"e": "x", "f": {}}}
+        for i in range(20)
+    })
+
+
+def test_loader_parity(document):
+    pure, libyaml = yaml.load(document, Loader=NXCLLoader), yaml.load(document, Loader=NXCLCLoader)
+    assert type(pure) is type(libyaml) is ConfigDict
+    for key in ("x", "c", "alias", "merged", "x.nested.f"):
+        assert type(libyaml[key]) is ConfigDict
+    assert pure.pop("ns").__dict__ == libyaml.pop("ns").__dict__ == {"a": 1}
+    assert pure == libyaml
+    assert libyaml.join is os.path.join
+    assert libyaml.frac == fractions.Fraction(1, 3)
+    assert libyaml.merged == {"k": 2, "l": [1, 2]}
+    assert libyaml.x == libyaml.y and libyaml.x is not libyaml.y
+
+
+def test_full_and_safe_loader_parity(document):
+    full = document.split("join:")[0]
+    assert yaml.load(full, Loader=NXCLFullLoader) == yaml.load(full, Loader=NXCLCFullLoader)
+    safe = full.replace("!include inc.yaml", "{a: 1}")
+    assert yaml.load(safe, Loader=NXCLSafeLoader) == yaml.load(safe, Loader=NXCLCSafeLoader)
+
+
+@pytest.mark.parametrize("Dumper, CDumper", [
+    (NXCLSafeDumper, NXCLCSafeDumper),
+    (NXCLDumper, NXCLCDumper),
+])
+def test_dumper_parity(Dumper, CDumper):
+    config = make_config()
+    shared = [1, 2]
+    config["s.a"], config["s.b"] = shared, shared
+    assert yaml.dump(config, Dumper=Dumper) == yaml.dump(config, Dumper=CDumper)
+    assert "&id001" in yaml.dump(config, Dumper=CDumper)
+
+
+def test_dumper_round_trip():
+    config = make_config()
+    config["t.join"] = os.path.join
+    config["t.ns"] = argparse.Namespace(a=1)
+    for Dumper in (NXCLDumper, NXCLCDumper):
+        for Loader in (NXCLLoader, NXCLCLoader):
+            loaded = yaml.load(yaml.dump(config, Dumper=Dumper), Loader=Loader)
+            assert loaded.pop("t.ns").__dict__ == {"a": 1}
+            assert loaded["t.join"] is os.path.join
+            del loaded["t"]
+            assert loaded == make_config()
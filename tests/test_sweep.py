@@ -0,0 +1,68 @@
+import pytest
+
+from nxcl.config import ConfigDict, Sweep
+
+
+def make_sweep():
+    config = ConfigDict({"train": {"lr": 1.0, "epochs": 10}, "model": {"width": 32, "depth": 1}})
+    return Sweep(config, {
+        "train.lr": [0.1, 0.01],
+        ("model.width", "model.depth"): [(64, 2), (128, 4), (256, 8)],
+    })
+
+
+def test_last_axis_varies_fastest():
+    sweep = make_sweep()
+    assert len(sweep) == 6
+    assert [sweep.overrides(i) for i in (0, 1, 3)] == [
+        {"train.lr": 0.1, "model.width": 64, "model.depth": 2},
+        {"train.lr": 0.1, "model.width": 128, "model.depth": 4},
+        {"train.lr": 0.01, "model.width": 64, "model.depth": 2},
+    ]
+    for index, variant in enumerate(sweep):
+        for key, value in sweep.overrides(index).items():
+            assert variant[key] == value
+        assert variant["train.epochs"] == 10
+    assert sweep[-1]["model.width"] == 256 and sweep[-1]["train.lr"] == 0.01
+
+
+def test_variants_do_not_change_base():
+    sweep = make_sweep()
+    variant = sweep[5]
+    variant["train.epochs"] = 20
+    assert sweep.config["train.lr"] == 1.0 and sweep.config["train.epochs"] == 10
+    assert sweep.config["model.width"] == 32
+
+
+def test_zipped_axis_length_is_checked():
+    with pytest.raises(ValueError):
+        Sweep(ConfigDict(), {("a", "b"): [(1, 2), (3,)]})
+    with pytest.raises(TypeError):
+        Sweep(ConfigDict(), {1: [1, 2]})
+
+
+def test_shard_and_sample_are_deterministic():
+    sweep = make_sweep()
+    shards = [[v.to_dict() for v in sweep.shard(rank, 4)] for rank in range(4)]
+    assert sorted(len(shard) for shard in shards) == [1, 1, 2, 2]
+    assert [v.to_dict() for v in sweep.shard(1, 4)] == [sweep[1].to_dict(), sweep[5].to_dict()]
+    assert sorted(map(repr, sum(shards, []))) == sorted(repr(v.to_dict()) for v in sweep)
+
+    sample = [v.to_dict() for v in sweep.sample(4, seed=0)]
+    assert sample == [v.to_dict() for v in sweep.sample(4, seed=0)]
+    assert len({repr(v) for v in sample}) == 4
+    assert len(sweep.sample(10, seed=0)) == 6
+    assert [v.to_dict() for v in sweep.sample(4, seed=0).shard(0, 2)] == sample[::2]
+    with pytest.raises(IndexError):
+        sweep.shard(4, 4)
+
+
+def test_out_of_range_index():
+    sweep = make_sweep()
+    for index in (6, -7):
+        with pytest.raises(IndexError, match="Sweep index"):
+            sweep[index]
+    with pytest.raises(IndexError, match="Sweep index"):
+        sweep[4:][2]
+    with pytest.raises(IndexError):
+        sweep.overrides(6)